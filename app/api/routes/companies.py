@@ -1,13 +1,15 @@
+import asyncio
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query
 from typing import Optional, List
-from uuid import uuid4
-from datetime import datetime
 from bson import ObjectId
 from pydantic import BaseModel, HttpUrl
 
+from app.core.responses import MongoJSONResponse
 from app.core.security import verify_api_key
-from app.db.mongodb import get_companies_collection, get_tasks_collection
+from app.db.mongodb import get_companies_collection, fetch_latest_page, make_task, task_status_cache, task_writer, update_task
 from app.scrapers.company_scraper import CompanyScraper
+from app.utils.id_helpers import validate_object_id
+from app.utils.search_helpers import build_search_query, find_matches
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,18 +23,28 @@ class CompanyRequest(BaseModel):
 
 async def create_task(task_type: str, url: HttpUrl) -> str:
     """Create a task record in the database"""
-    task_id = str(uuid4())
-    task = {
-        "_id": task_id,
-        "type": task_type,
-        "url": str(url),  # Convert HttpUrl to string
-        "status": "pending",
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
-    tasks_collection = get_tasks_collection()
-    await tasks_collection.insert_one(task)
-    return task_id
+    task = make_task(task_type, url=str(url))  # Convert HttpUrl to string
+    await task_writer.insert(task)
+    return task["_id"]
+
+async def _run_company_scrape(url, task_id):
+    """Run a company scrape in the background, recording failures on the task"""
+    scraper = None
+    try:
+        logger.info(f"Starting background task {task_id} for {url}")
+
+        # Create scraper and run; it marks the task in_progress itself
+        scraper = CompanyScraper()
+        result = await scraper.scrape_company(str(url), task_id, include_employees=True)
+
+        logger.info(f"Background task {task_id} completed: {result is not None}")
+    except Exception as e:
+        logger.error(f"Unhandled exception in background task {task_id}: {str(e)}")
+        # Update task as failed
+        await update_task(task_id, "failed", error=str(e))
+    finally:
+        if scraper:
+            await scraper.aclose()
 
 @router.post("/scrape")
 async def scrape_company(
@@ -45,42 +57,15 @@ async def scrape_company(
     # Add debug log
     logger.info(f"Created task {task_id} for URL {request.url}")
     
-    # Start background task with proper error handling
-    async def scrape_with_error_handling(url, task_id):
-        try:
-            logger.info(f"Starting background task {task_id} for {url}")
-            
-            # Update task to "in_progress" immediately
-            tasks_collection = get_tasks_collection()
-            await tasks_collection.update_one(
-                {"_id": task_id},
-                {"$set": {"status": "in_progress", "updated_at": datetime.now()}}
-            )
-            
-            # Create scraper and run
-            scraper = CompanyScraper()
-            result = await scraper.scrape_company(str(url), task_id, include_employees=True)
-            
-            logger.info(f"Background task {task_id} completed: {result is not None}")
-        except Exception as e:
-            logger.error(f"Unhandled exception in background task {task_id}: {str(e)}")
-            # Update task as failed
-            tasks_collection = get_tasks_collection()
-            await tasks_collection.update_one(
-                {"_id": task_id},
-                {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.now()}}
-            )
-    
     # Use add_task to run the function in the background
-    background_tasks.add_task(scrape_with_error_handling, request.url, task_id)
+    background_tasks.add_task(_run_company_scrape, request.url, task_id)
     
     return {"task_id": str(task_id)}
 
 @router.get("/status/{task_id}")
 async def get_task_status(task_id: str):
     """Get status of a scraping task"""
-    tasks_collection = get_tasks_collection()
-    task = await tasks_collection.find_one({"_id": task_id})
+    task = await task_status_cache.get(task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -97,28 +82,26 @@ async def get_task_status(task_id: str):
 async def list_all_companies(
     limit: int = Query(50, le=500),
     skip: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="ID of the last company from the previous page"),
     api_key: str = Depends(verify_api_key)
 ):
     """Get all companies in the database with pagination"""
     collection = get_companies_collection()
+    after_id = validate_object_id(after) if after else None
     
-    # Execute query with pagination
-    cursor = collection.find().sort("metadata.scraped_at", -1).skip(skip).limit(limit)
-    companies = await cursor.to_list(length=limit)
-    
-    # Get total count for pagination info
-    total = await collection.count_documents({})
+    # Fetch the page and the total count (from collection metadata) concurrently;
+    # the total is approximate and includes documents still being scraped
+    companies, total = await asyncio.gather(
+        fetch_latest_page(collection, skip, limit, after_id),
+        collection.estimated_document_count()
+    )
     
-    # Convert MongoDB _id to string
-    for company in companies:
-        company["_id"] = str(company["_id"])
-    
-    return {
+    return MongoJSONResponse({
         "total": total,
         "skip": skip,
         "limit": limit,
         "data": companies
-    }
+    })
 
 @router.get("/search")
 async def search_companies(
@@ -136,32 +119,18 @@ async def search_companies(
     collection = get_companies_collection()
     
     # Build query
-    query = {}
-    if q:
-        # Full text search across all fields
-        query["$text"] = {"$search": q}
-    
-    # Add specific field searches
-    if name:
-        query["name"] = {"$regex": name, "$options": "i"}
-    if industry:
-        query["industry"] = {"$regex": industry, "$options": "i"}
-    if company_size:
-        query["company_size"] = {"$regex": company_size, "$options": "i"}
-    if website:
-        query["website"] = {"$regex": website, "$options": "i"}
-    if location:
-        query["location"] = {"$regex": location, "$options": "i"}
+    query = build_search_query(q, {
+        "name": name,
+        "industry": industry,
+        "company_size": company_size,
+        "website": website,
+        "location": location
+    })
     
     # Execute query
-    cursor = collection.find(query).skip(skip).limit(limit)
-    companies = await cursor.to_list(length=limit)
+    companies = await find_matches(collection, query, skip, limit)
     
-    # Convert MongoDB _id to string
-    for company in companies:
-        company["_id"] = str(company["_id"])
-        
-    return companies
+    return MongoJSONResponse(companies)
 
 @router.get("/{company_id}")
 async def get_company(
@@ -171,10 +140,9 @@ async def get_company(
     """Get a specific company by ID"""
     collection = get_companies_collection()
     
-    try:
-        company = await collection.find_one({"_id": ObjectId(company_id)})
-    except Exception:
+    if not ObjectId.is_valid(company_id):
         raise HTTPException(status_code=400, detail="Invalid company ID format")
+    company = await collection.find_one({"_id": ObjectId(company_id)})
         
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
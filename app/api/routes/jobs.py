@@ -1,13 +1,16 @@
+import asyncio
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query
 from typing import Optional, List
-from uuid import uuid4
 from datetime import datetime
 from bson import ObjectId
 from pydantic import BaseModel, HttpUrl
 
+from app.core.responses import MongoJSONResponse
 from app.core.security import verify_api_key
-from app.db.mongodb import get_jobs_collection, get_tasks_collection
+from app.db.mongodb import get_jobs_collection, fetch_latest_page, make_task, task_status_cache, task_writer
 from app.scrapers.job_scraper import JobScraper
+from app.utils.id_helpers import validate_object_id
+from app.utils.search_helpers import build_search_query, find_matches
 
 router = APIRouter()
 
@@ -29,20 +32,15 @@ async def search_jobs_on_linkedin(
 ):
     """Search and scrape jobs from LinkedIn with proxy rotation"""
     # Create task in database first
-    task_id = str(uuid4())
-    task = {
-        "_id": task_id,
-        "type": "job_search_scrape",
-        "keywords": request.keywords,
-        "location": request.location,
-        "limit": request.limit,
-        "status": "pending",
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    task = make_task(
+        "job_search_scrape",
+        keywords=request.keywords,
+        location=request.location,
+        limit=request.limit
+    )
+    task_id = task["_id"]
     
-    tasks_collection = get_tasks_collection()
-    await tasks_collection.insert_one(task)
+    await task_writer.insert(task)
     
     # Handle background vs. synchronous processing
     if request.background:
@@ -88,18 +86,10 @@ async def scrape_job(
 ):
     """Scrape a specific LinkedIn job with proxy rotation"""
     # Create task in database first
-    task_id = str(uuid4())
-    task = {
-        "_id": task_id,
-        "type": "job_scrape",
-        "url": str(request.url),
-        "status": "pending",
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    task = make_task("job_scrape", url=str(request.url))
+    task_id = task["_id"]
     
-    tasks_collection = get_tasks_collection()
-    await tasks_collection.insert_one(task)
+    await task_writer.insert(task)
     
     # Handle background vs. synchronous processing
     if request.background:
@@ -139,34 +129,43 @@ async def get_task_status(
     api_key: str = Depends(verify_api_key)
 ):
     """Get status of a scraping task"""
-    # Implementation same as other routes
+    task = await task_status_cache.get(task_id)
+    
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+        
+    return {
+        "task_id": task_id,
+        "status": task.get("status", "unknown"),
+        "updated_at": task.get("updated_at", None),
+        "result_id": str(task.get("result_id", "")) if task.get("result_id") else None,
+        "error": task.get("error", None)
+    }
 
 @router.get("/")
 async def list_all_jobs(
     limit: int = Query(50, le=500),
     skip: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="ID of the last job from the previous page"),
     api_key: str = Depends(verify_api_key)
 ):
     """Get all jobs in the database with pagination"""
     collection = get_jobs_collection()
+    after_id = validate_object_id(after) if after else None
     
-    # Execute query with pagination
-    cursor = collection.find().sort("metadata.scraped_at", -1).skip(skip).limit(limit)
-    jobs = await cursor.to_list(length=limit)
+    # Fetch the page and the total count (from collection metadata) concurrently;
+    # the total is approximate and includes documents still being scraped
+    jobs, total = await asyncio.gather(
+        fetch_latest_page(collection, skip, limit, after_id),
+        collection.estimated_document_count()
+    )
     
-    # Get total count for pagination info
-    total = await collection.count_documents({})
-    
-    # Convert MongoDB _id to string
-    for job in jobs:
-        job["_id"] = str(job["_id"])
-    
-    return {
+    return MongoJSONResponse({
         "total": total,
         "skip": skip,
         "limit": limit,
         "data": jobs
-    }
+    })
 
 @router.get("/search")
 async def search_jobs_in_database(
@@ -186,22 +185,13 @@ async def search_jobs_in_database(
     collection = get_jobs_collection()
     
     # Build query
-    query = {}
-    if q:
-        # Full text search across all fields
-        query["$text"] = {"$search": q}
-    
-    # Add specific field searches
-    if title:
-        query["job_title"] = {"$regex": title, "$options": "i"}
-    if company:
-        query["company"] = {"$regex": company, "$options": "i"}
-    if location:
-        query["location"] = {"$regex": location, "$options": "i"}
-    if job_type:
-        query["job_type"] = {"$regex": job_type, "$options": "i"}
-    if experience_level:
-        query["experience_level"] = {"$regex": experience_level, "$options": "i"}
+    query = build_search_query(q, {
+        "job_title": title,
+        "company": company,
+        "location": location,
+        "job_type": job_type,
+        "experience_level": experience_level
+    })
     
     # Date range filters if specified
     date_filter = {}
@@ -221,14 +211,9 @@ async def search_jobs_in_database(
         query["metadata.scraped_at"] = date_filter
     
     # Execute query
-    cursor = collection.find(query).skip(skip).limit(limit)
-    jobs = await cursor.to_list(length=limit)
+    jobs = await find_matches(collection, query, skip, limit)
     
-    # Convert MongoDB _id to string
-    for job in jobs:
-        job["_id"] = str(job["_id"])
-        
-    return jobs
+    return MongoJSONResponse(jobs)
 
 @router.get("/{job_id}")
 async def get_job(
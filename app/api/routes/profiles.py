@@ -1,25 +1,43 @@
+import asyncio
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Query
 from typing import Optional, List
 import logging
-from uuid import uuid4
-from datetime import datetime
 from bson import ObjectId
 from pydantic import BaseModel, HttpUrl
 
+from app.core.responses import MongoJSONResponse
 from app.core.security import verify_api_key
-from app.db.mongodb import get_profiles_collection, get_tasks_collection
+from app.db.mongodb import get_profiles_collection, fetch_latest_page, get_tasks_collection, make_task, task_status_cache, task_writer, update_task
 from app.scrapers.profile_scraper import ProfileScraper
-router = APIRouter()
+from app.utils.id_helpers import validate_object_id
+from app.utils.search_helpers import build_search_query, find_matches
+
+logger = logging.getLogger(__name__)
 
-# Configure logger
-logger = logging.getLogger("profiles_logger")
-logging.basicConfig(level=logging.INFO)
 router = APIRouter()
 
 class ProfileRequest(BaseModel):
     url: HttpUrl
     background: bool = True
 
+async def _run_profile_scrape(url, task_id):
+    """Run a profile scrape in the background, recording failures on the task"""
+    try:
+        logger.info(f"Starting background task {task_id} for {url}")
+
+        # Update task to "in_progress" immediately
+        await update_task(task_id, "in_progress")
+
+        # Create scraper and run
+        scraper = ProfileScraper()
+        result = await scraper.scrape_profile(str(url), task_id)
+
+        logger.info(f"Background task {task_id} completed: {result is not None}")
+    except Exception as e:
+        logger.error(f"Unhandled exception in background task {task_id}: {str(e)}")
+        # Update task as failed
+        await update_task(task_id, "failed", error=str(e))
+
 @router.post("/scrape")
 async def scrape_profile(
     request: ProfileRequest,
@@ -28,49 +46,15 @@ async def scrape_profile(
 ):
     """Scrape a LinkedIn profile with proxy rotation"""
     # Create task in database first
-    task_id = str(uuid4())
-    task = {
-        "_id": task_id,
-        "type": "profile_scrape",
-        "url": str(request.url),
-        "status": "pending",
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
+    task = make_task("profile_scrape", url=str(request.url))
+    task_id = task["_id"]
     
-    tasks_collection = get_tasks_collection()
-    await tasks_collection.insert_one(task)
+    await task_writer.insert(task)
     
     # Handle background vs. synchronous processing
     if request.background:
-        # Start background scraping task
-        async def scrape_with_error_handling(url, task_id):
-            try:
-                logger.info(f"Starting background task {task_id} for {url}")
-                
-                # Update task to "in_progress" immediately
-                tasks_collection = get_tasks_collection()
-                await tasks_collection.update_one(
-                    {"_id": task_id},
-                    {"$set": {"status": "in_progress", "updated_at": datetime.now()}}
-                )
-                
-                # Create scraper and run
-                scraper = ProfileScraper()
-                result = await scraper.scrape_profile(str(url), task_id)
-                
-                logger.info(f"Background task {task_id} completed: {result is not None}")
-            except Exception as e:
-                logger.error(f"Unhandled exception in background task {task_id}: {str(e)}")
-                # Update task as failed
-                tasks_collection = get_tasks_collection()
-                await tasks_collection.update_one(
-                    {"_id": task_id},
-                    {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.now()}}
-                )
-        
         # Use add_task to run the function in the background
-        background_tasks.add_task(scrape_with_error_handling, str(request.url), task_id)
+        background_tasks.add_task(_run_profile_scrape, str(request.url), task_id)
         
         return {
             "task_id": task_id,
@@ -100,8 +84,7 @@ async def get_task_status(
     api_key: str = Depends(verify_api_key)
 ):
     """Get status of a scraping task"""
-    tasks_collection = get_tasks_collection()
-    task = await tasks_collection.find_one({"_id": task_id})
+    task = await task_status_cache.get(task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -118,28 +101,26 @@ async def get_task_status(
 async def list_all_profiles(
     limit: int = Query(50, le=500),
     skip: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="ID of the last profile from the previous page"),
     api_key: str = Depends(verify_api_key)
 ):
     """Get all profiles in the database with pagination"""
     collection = get_profiles_collection()
+    after_id = validate_object_id(after) if after else None
     
-    # Execute query with pagination
-    cursor = collection.find().sort("metadata.scraped_at", -1).skip(skip).limit(limit)
-    profiles = await cursor.to_list(length=limit)
-    
-    # Get total count for pagination info
-    total = await collection.count_documents({})
-    
-    # Convert MongoDB _id to string
-    for profile in profiles:
-        profile["_id"] = str(profile["_id"])
+    # Fetch the page and the total count (from collection metadata) concurrently;
+    # the total is approximate and includes documents still being scraped
+    profiles, total = await asyncio.gather(
+        fetch_latest_page(collection, skip, limit, after_id),
+        collection.estimated_document_count()
+    )
     
-    return {
+    return MongoJSONResponse({
         "total": total,
         "skip": skip,
         "limit": limit,
         "data": profiles
-    }
+    })
 
 @router.get("/search")
 async def search_profiles(
@@ -159,36 +140,20 @@ async def search_profiles(
     collection = get_profiles_collection()
     
     # Build query
-    query = {}
-    if q:
-        # Full text search across all fields
-        query["$text"] = {"$search": q}
-    
-    # Add specific field searches
-    if name:
-        query["name"] = {"$regex": name, "$options": "i"}
-    if headline:
-        query["headline"] = {"$regex": headline, "$options": "i"}
-    if company:
-        query["company"] = {"$regex": company, "$options": "i"}
-    if location:
-        query["location"] = {"$regex": location, "$options": "i"}
-    if skills:
-        query["skills"] = {"$in": [{"$regex": skills, "$options": "i"}]}
-    if university:
-        query["educations.school"] = {"$regex": university, "$options": "i"}
-    if experience:
-        query["experiences.title"] = {"$regex": experience, "$options": "i"}
+    query = build_search_query(q, {
+        "name": name,
+        "headline": headline,
+        "company": company,
+        "location": location,
+        "skills": skills,
+        "educations.school": university,
+        "experiences.title": experience
+    })
     
     # Execute query
-    cursor = collection.find(query).skip(skip).limit(limit)
-    profiles = await cursor.to_list(length=limit)
+    profiles = await find_matches(collection, query, skip, limit)
     
-    # Convert MongoDB _id to string
-    for profile in profiles:
-        profile["_id"] = str(profile["_id"])
-        
-    return profiles
+    return MongoJSONResponse(profiles)
 
 @router.get("/{profile_id}")
 async def get_profile(
@@ -198,10 +163,9 @@ async def get_profile(
     """Get a specific profile by ID"""
     collection = get_profiles_collection()
     
-    try:
-        profile = await collection.find_one({"_id": ObjectId(profile_id)})
-    except Exception:
+    if not ObjectId.is_valid(profile_id):
         raise HTTPException(status_code=400, detail="Invalid profile ID format")
+    profile = await collection.find_one({"_id": ObjectId(profile_id)})
         
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -227,6 +191,8 @@ async def get_task_result(
     result_id = task.get("result_id")
     if not result_id:
         raise HTTPException(status_code=400, detail="Task has no result ID")
+    if not ObjectId.is_valid(result_id):
+        raise HTTPException(status_code=400, detail="Invalid result ID format")
         
     # Get the actual profile data
     profiles_collection = get_profiles_collection()
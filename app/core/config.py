@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 import os
-from typing import List
+from typing import FrozenSet, List
 
 class Settings(BaseSettings):
     # API settings
@@ -13,16 +13,22 @@ class Settings(BaseSettings):
     # MongoDB settings
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "linkedin_data")
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
     
     # LinkedIn credentials
     LINKEDIN_USER: str = os.getenv("LINKEDIN_USER", "")
     LINKEDIN_PASSWORD: str = os.getenv("LINKEDIN_PASSWORD", "")
     
+    # Scraping
+    SCRAPER_WORKERS: int = int(os.getenv("SCRAPER_WORKERS", "16"))  # threads for blocking Selenium calls
+    DRIVER_POOL_SIZE: int = int(os.getenv("DRIVER_POOL_SIZE", "4"))  # warm browsers shared by job/profile scrapers
+    
     # Rate limiting
     RATE_LIMIT: int = int(os.getenv("RATE_LIMIT", "60"))  # requests per minute
     
     # Security
-    API_KEYS: List[str] = os.getenv("API_KEYS", "test_api_key").split(",")
+    API_KEYS: FrozenSet[str] = frozenset(os.getenv("API_KEYS", "test_api_key").split(","))
     
     # CORS
     ALLOWED_ORIGINS: List[str] = os.getenv("ALLOWED_ORIGINS", "*").split(",")
@@ -1,4 +1,5 @@
 import time
+from collections import OrderedDict
 from fastapi import HTTPException, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.core.config import settings
@@ -7,31 +8,41 @@ import logging
 logger = logging.getLogger("app.middleware")
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Limits request rate per IP address"""
-    def __init__(self, app):
+    """Limits request rate per IP address using a token bucket"""
+    def __init__(self, app, max_clients=65536):
         super().__init__(app)
         self.rate_limit = settings.RATE_LIMIT
-        self.requests = {}  # dict to store IP: [timestamp1, timestamp2, ...]
         self.window = 60  # window in seconds
+        self.refill_rate = self.rate_limit / self.window  # tokens per second
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()  # LRU of IP: [tokens, last_refill]
     
     async def dispatch(self, request: Request, call_next):
         # Get IP address
         ip = request.client.host
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Clean up old requests
-        if ip in self.requests:
-            self.requests[ip] = [t for t in self.requests[ip] if current_time - t < self.window]
+        # Refill the bucket for the time elapsed since the last request
+        bucket = self.buckets.get(ip)
+        if bucket is None:
+            bucket = [float(self.rate_limit), current_time]
+            self.buckets[ip] = bucket
+            # Evict the least recently seen IP to keep memory bounded
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
         else:
-            self.requests[ip] = []
+            self.buckets.move_to_end(ip)
+            elapsed = current_time - bucket[1]
+            bucket[0] = min(self.rate_limit, bucket[0] + elapsed * self.refill_rate)
+            bucket[1] = current_time
         
         # Check if rate limit is exceeded
-        if len(self.requests[ip]) >= self.rate_limit:
+        if bucket[0] < 1:
             logger.warning(f"Rate limit exceeded for IP: {ip}")
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
         
-        # Add current request
-        self.requests[ip].append(current_time)
+        # Consume a token for the current request
+        bucket[0] -= 1
         
         # Process the request
         return await call_next(request)
\ No newline at end of file
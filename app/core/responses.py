@@ -0,0 +1,24 @@
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+
+def _encode_bson(obj):
+    """Serialize BSON types orjson doesn't know about"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type {type(obj)} not JSON serializable")
+
+class MongoJSONResponse(ORJSONResponse):
+    """orjson response that serializes raw MongoDB documents directly
+
+    Return it from a handler to skip FastAPI's jsonable_encoder pass, so
+    ObjectId values don't need converting by hand. MongoDB datetimes are
+    naive UTC and are rendered with an explicit UTC offset.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_encode_bson,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        )
\ No newline at end of file
@@ -5,7 +5,7 @@ from app.core.config import settings
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 
 async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
-    """Verify that the API key is valid"""
+    """Verify that the API key is valid (hash lookup against the key set)"""
     if api_key not in settings.API_KEYS:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
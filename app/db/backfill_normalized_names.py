@@ -0,0 +1,49 @@
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.utils.id_helpers import company_name, normalize_name
+
+BATCH_SIZE = 1000
+
+# Lookup fields derived from each document; lowercased in Python because
+# $toLower only folds ASCII
+NORMALIZED_FIELDS = {
+    "companies": {"name_lower": company_name},
+    "jobs": {
+        "job_title_lower": lambda job: job.get("job_title"),
+        "company_lower": lambda job: job.get("company")
+    }
+}
+
+async def _backfill(collection, fields):
+    """Set the normalized fields on every document still missing one"""
+    query = {"$or": [{field: {"$exists": False}} for field in fields]}
+    projection = {"name": 1, "raw_data.name": 1, "job_title": 1, "company": 1}
+    operations = []
+    updated = 0
+
+    async for doc in collection.find(query, projection):
+        values = {field: normalize_name(source(doc)) for field, source in fields.items()}
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": values}))
+        if len(operations) >= BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        updated += len(operations)
+    print(f"Backfilled {updated} documents in {collection.name} collection")
+
+# Run this script once to fill in documents scraped before the fields existed
+async def _main():
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.MONGODB_DB_NAME]
+        await asyncio.gather(*(_backfill(db[name], fields) for name, fields in NORMALIZED_FIELDS.items()))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,15 +1,41 @@
+import asyncio
 import logging
 import motor.motor_asyncio
 import certifi
 import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+from fastapi import HTTPException
+from pymongo import InsertOne, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
 from app.core.config import settings
 
 logger = logging.getLogger("app.db")
 client = None
 db = None
 
+# Collection handles, cached once connected
+companies_collection = None
+profiles_collection = None
+jobs_collection = None
+tasks_collection = None
+progress_tasks_collection = None
+
+# Task statuses that are progress breadcrumbs rather than durable outcomes
+PROGRESS_STATUSES = frozenset({"in_progress", "processing"})
+
+# Connection pool options shared by every client construction
+POOL_OPTIONS = {
+    "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+    "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+    "maxIdleTimeMS": 300000,  # Drop idle connections after 5 minutes
+    "maxConnecting": 4,  # Avoid connection storms on startup
+    "waitQueueTimeoutMS": 10000
+}
+
 async def connect_to_mongo():
-    global client, db
+    global client, db, companies_collection, profiles_collection, jobs_collection, tasks_collection, progress_tasks_collection
     try:
         # Get Python version
         is_python_313 = sys.version_info.major == 3 and sys.version_info.minor >= 13
@@ -42,14 +68,16 @@ async def connect_to_mongo():
                     direct_url,
                     tlsCAFile=certifi.where(),
                     tlsAllowInvalidCertificates=True,  # Only for development
-                    serverSelectionTimeoutMS=30000  # Increase timeout
+                    serverSelectionTimeoutMS=30000,  # Increase timeout
+                    **POOL_OPTIONS
                 )
             else:
                 # Fallback to original URL with minimal parameters
                 client = motor.motor_asyncio.AsyncIOMotorClient(
                     settings.MONGODB_URL,
                     tlsAllowInvalidCertificates=True,  # Only for development
-                    serverSelectionTimeoutMS=30000
+                    serverSelectionTimeoutMS=30000,
+                    **POOL_OPTIONS
                 )
         else:
             # Regular connection for Python ≤ 3.12
@@ -58,12 +86,22 @@ async def connect_to_mongo():
                 serverSelectionTimeoutMS=30000,
                 connectTimeoutMS=30000,
                 socketTimeoutMS=60000,
-                tlsCAFile=certifi.where()
+                tlsCAFile=certifi.where(),
+                **POOL_OPTIONS
             )
         
         # Test connection immediately
         await client.admin.command('ping')
         db = client[settings.MONGODB_DB_NAME]
+        companies_collection = db["companies"]
+        profiles_collection = db["profiles"]
+        jobs_collection = db["jobs"]
+        tasks_collection = db["tasks"]
+        # Unacknowledged writes so progress updates never wait on replication
+        progress_tasks_collection = tasks_collection.with_options(write_concern=WriteConcern(w=0))
+        
+        # Open the minimum pool connections up front
+        await warmup()
         
         # Create indexes for faster queries
         #await create_indexes()
@@ -73,6 +111,15 @@ async def connect_to_mongo():
         logger.error(f"Failed to connect to MongoDB: {str(e)}")
         raise
 
+async def warmup(connections=None):
+    """Prefill the connection pool so the first requests don't pay connect latency"""
+    count = connections or settings.MONGODB_MIN_POOL_SIZE
+    try:
+        await asyncio.gather(*(client.admin.command('ping') for _ in range(count)))
+        logger.info(f"Warmed up {count} MongoDB connections")
+    except Exception as e:
+        logger.warning(f"MongoDB pool warmup failed: {str(e)}")
+
 # async def create_indexes():
 #     """Create necessary indexes for MongoDB collections"""
 #     try:
@@ -100,14 +147,291 @@ async def close_mongo_connection():
         client.close()
         logger.info("Closed MongoDB connection")
 
+def get_database():
+    return db
+
 def get_companies_collection():
-    return db["companies"]
+    return companies_collection
 
 def get_profiles_collection():
-    return db["profiles"]
+    return profiles_collection
 
 def get_jobs_collection():
-    return db["jobs"]
+    return jobs_collection
 
 def get_tasks_collection():
-    return db["tasks"]
\ No newline at end of file
+    return tasks_collection
+
+def get_progress_tasks_collection():
+    return progress_tasks_collection
+
+def make_task(task_type, **fields):
+    """Build a pending task document with a fresh ID and timestamps"""
+    now = datetime.utcnow()
+    return {
+        "_id": uuid4().hex,
+        "type": task_type,
+        **fields,
+        "status": "pending",
+        "created_at": now,
+        "updated_at": now
+    }
+
+async def fetch_latest_page(collection, skip, limit, after=None):
+    """Fetch a page of documents, newest first
+
+    When `after` (the _id of the last document already seen) is given, the
+    page starts right after it using the sort index instead of skipping; an
+    `after` that isn't a listed document of this collection is a 404.
+
+    Documents not yet stamped with metadata.scraped_at (scrapes still
+    running) are left out, so a collection's estimated_document_count can
+    exceed what paging through it returns.
+    """
+    # Matches the sort index's partial filter so the planner can use it
+    query = {"metadata.scraped_at": {"$exists": True}}
+    if after is not None:
+        last = await collection.find_one({"_id": after, **query}, {"metadata.scraped_at": 1})
+        if not last:
+            # Starting over from the first page would loop clients forever
+            raise HTTPException(status_code=404, detail=f"No document with ID {after} to page after")
+        scraped_at = last["metadata"]["scraped_at"]
+        query["$or"] = [
+            {"metadata.scraped_at": {"$lt": scraped_at}},
+            {"metadata.scraped_at": scraped_at, "_id": {"$lt": after}}
+        ]
+    
+    # Fetch in bounded batches
+    cursor = collection.find(query).sort([("metadata.scraped_at", -1), ("_id", -1)]).skip(skip).limit(limit).batch_size(min(limit, 100))
+    return [document async for document in cursor]
+
+# Queued by BatchWriter.stop after the last write the drain task must flush
+_STOP = object()
+
+class BatchWriter:
+    """Coalesces writes to one collection issued close together into a single bulk_write"""
+    
+    def __init__(self, get_collection, name, max_batch=128, max_delay=0.005, bypass_validation=False):
+        self.get_collection = get_collection
+        self.name = name
+        self.max_batch = max_batch
+        self.max_delay = max_delay  # seconds to wait for more writes before flushing
+        self.bypass_validation = bypass_validation  # skip server-side schema validation
+        self.queue = None
+        self.worker = None
+    
+    async def start(self):
+        """Start the background drain task (called on app startup)"""
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._drain())
+            logger.info(f"{self.name} writer started")
+    
+    async def stop(self):
+        """Stop the drain task and flush any writes still waiting"""
+        if self.worker is None:
+            return
+        # Writes from here on go straight to MongoDB; the drain task flushes
+        # everything queued before the stop marker and then returns, so a
+        # batch is never cut off mid-write with its callers left waiting
+        worker, self.worker = self.worker, None
+        self.queue.put_nowait(_STOP)
+        await worker
+        logger.info(f"{self.name} writer stopped")
+    
+    async def insert(self, document):
+        """Insert a document, returning once its batch is flushed"""
+        await self._submit(InsertOne(document))
+    
+    def submit_nowait(self, operation):
+        """Queue a write without waiting for it; failures are logged"""
+        if self.worker is None:
+            future = asyncio.ensure_future(self._bulk_write([operation]))
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self.queue.put_nowait((operation, future))
+        future.add_done_callback(self._log_failure)
+        return future
+    
+    def _log_failure(self, future):
+        if not future.cancelled() and future.exception():
+            logger.error(f"{self.name} write failed: {str(future.exception())}")
+    
+    async def _submit(self, operation):
+        # Write directly when the batcher isn't running (scripts, tests)
+        if self.worker is None:
+            await self._bulk_write([operation])
+            return
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((operation, future))
+        await future
+    
+    def _bulk_write(self, operations):
+        return self.get_collection().bulk_write(
+            operations,
+            ordered=False,
+            bypass_document_validation=self.bypass_validation
+        )
+    
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            
+            # Collect whatever else arrives within the flush window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+    
+    async def _flush(self, batch):
+        # Batches are written unordered. An insert is awaited before its
+        # document is updated, so the two never share a batch. Progress
+        # updates go through their own unacknowledged writer and may land
+        # after the task's final status, which is safe only because they
+        # filter on status $nin completed/failed and so can't overwrite it
+        failed = {}
+        try:
+            await self._bulk_write([op for op, _ in batch])
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        except Exception as e:
+            logger.error(f"{self.name} batch write failed: {str(e)}")
+            failed = {i: e for i in range(len(batch))}
+        
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i in failed:
+                error = failed[i]
+                future.set_exception(error if isinstance(error, Exception) else BulkWriteError({"writeErrors": [error]}))
+            else:
+                future.set_result(None)
+
+class TaskWriter(BatchWriter):
+    """Batches task inserts and status updates"""
+    
+    def __init__(self, get_collection=get_tasks_collection, name="Task", max_batch=128, max_delay=0.005):
+        super().__init__(get_collection, name, max_batch, max_delay)
+    
+    async def update(self, task_id, fields):
+        """Apply a $set to a task, returning once its batch is flushed"""
+        await self._submit(UpdateOne({"_id": task_id}, {"$set": fields}))
+        task_status_cache.invalidate(task_id)
+    
+    def update_nowait(self, task_id, fields, task_filter=None):
+        """Queue a $set to a task without waiting for the write"""
+        future = self.submit_nowait(UpdateOne(task_filter or {"_id": task_id}, {"$set": fields}))
+        future.add_done_callback(lambda done: self._invalidate_after(done, task_id))
+    
+    @staticmethod
+    def _invalidate_after(future, task_id):
+        # Nobody awaits the write, so retrieve its outcome here (the failure
+        # itself is logged by submit_nowait)
+        if not future.cancelled():
+            future.exception()
+        task_status_cache.invalidate(task_id)
+
+task_writer = TaskWriter()
+# Progress pings on the unacknowledged (w=0) handle; the final status always
+# goes through task_writer
+progress_task_writer = TaskWriter(get_progress_tasks_collection, "Task progress")
+
+# Scraped companies arrive seconds apart, so wait longer to fill a batch
+company_writer = BatchWriter(get_companies_collection, "Company", max_batch=50, max_delay=0.5)
+# Jobs come straight from job_formatter, so their shape is trusted
+job_writer = BatchWriter(get_jobs_collection, "Job", max_batch=500, max_delay=0.2, bypass_validation=True)
+profile_writer = BatchWriter(get_profiles_collection, "Profile", max_batch=500, max_delay=0.2)
+
+# Every batch writer the app starts and stops
+BATCH_WRITERS = (task_writer, progress_task_writer, company_writer, job_writer, profile_writer)
+
+class TaskStatusCache:
+    """Short-lived cache of task documents for status polling"""
+    
+    def __init__(self, ttl=0.25, maxsize=65536):
+        self.ttl = ttl  # seconds a cached task stays fresh
+        self.maxsize = maxsize
+        self.entries = {}  # task_id: (expires_at, task)
+        self.pending = {}  # task_id: in-flight lookup shared by concurrent pollers
+    
+    async def get(self, task_id):
+        """Return the task document, reading MongoDB at most once per TTL"""
+        entry = self.entries.get(task_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        
+        lookup = self.pending.get(task_id)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._load(task_id))
+            self.pending[task_id] = lookup
+            # Only clear our own lookup, not one started after an invalidate
+            lookup.add_done_callback(lambda done: self.pending.get(task_id) is done and self.pending.pop(task_id))
+        return await asyncio.shield(lookup)
+    
+    def invalidate(self, task_id):
+        """Drop a cached task after it has been updated, along with any read still in flight"""
+        self.entries.pop(task_id, None)
+        self.pending.pop(task_id, None)
+    
+    async def _load(self, task_id):
+        task = await get_tasks_collection().find_one({"_id": task_id})
+        # A read that was invalidated while running may predate the update
+        if self.pending.get(task_id) is not asyncio.current_task():
+            return task
+        if len(self.entries) >= self.maxsize:
+            # Evict the oldest entry
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[task_id] = (time.monotonic() + self.ttl, task)
+        return task
+
+task_status_cache = TaskStatusCache()
+
+async def update_task(task_id, status, result_id=None, result_ids=None, count=None, error=None, updated_at=None):
+    """Set a task's status along with whichever result fields are given"""
+    if not task_id:
+        return
+    
+    update_data = {
+        "status": status,
+        "updated_at": updated_at or datetime.utcnow()
+    }
+    
+    if result_id:
+        update_data["result_id"] = str(result_id)
+    
+    if result_ids:
+        update_data["result_ids"] = [str(id) for id in result_ids]
+    
+    if count is not None:
+        update_data["count"] = count
+    
+    if error:
+        update_data["error"] = error
+    
+    # Progress pings are queued unacknowledged without waiting; outcomes stay awaited
+    if status in PROGRESS_STATUSES:
+        # Queued writes may land late, so never overwrite a final status
+        progress_task_writer.update_nowait(
+            task_id, update_data,
+            {"_id": task_id, "status": {"$nin": ["completed", "failed"]}}
+        )
+        return
+    
+    # Batched with other scrapes' task writes into one bulk_write
+    await task_writer.update(task_id, update_data)
@@ -1,121 +1,192 @@
 import asyncio
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, TEXT
 from app.core.config import settings
+from app.db.mongodb import get_database
 import logging
 
 logger = logging.getLogger("app.db.indexes")
 
-async def setup_indexes():
-    """Set up indexes for MongoDB collections"""
-    print("Setting up MongoDB indexes...")
+# Bump whenever the index definitions below change so they get re-applied
+INDEX_VERSION = 6
+
+# Set once indexes are known to be in place for this process
+_indexes_ready = False
+
+# Fields covered by each collection's full-text index
+TEXT_INDEX_FIELDS = {
+    "companies": ["name", "industry", "description", "location", "website"],
+    "jobs": ["job_title", "company", "description", "location", "requirements"],
+    "profiles": ["name", "headline", "about", "location", "skills", "company"]
+}
+
+# Relevance weights for the text indexes; unlisted fields weigh 1
+TEXT_INDEX_WEIGHTS = {
+    "companies": {"name": 10, "industry": 3},
+    "jobs": {"job_title": 10, "company": 5},
+    "profiles": {"name": 10, "headline": 5, "skills": 3, "company": 3}
+}
+
+# Regular indexes, shaped after the queries the API actually runs. Fields
+# only ever matched through search are left to the text index.
+REGULAR_INDEXES = {
+    "companies": [
+        # Company lookup by normalized name (id_helpers)
+        [("name_lower", 1)],
+        # scraped_at for sorting, with _id as the tie-breaker so newest-first
+        # listings and keyset pagination walk the index
+        [("metadata.scraped_at", -1), ("_id", -1)]
+    ],
+    "jobs": [
+        # Job lookup by normalized company and title (id_helpers)
+        [("company_lower", 1), ("job_title_lower", 1)],
+        # job_type filter (not text indexed) combined with the scraped_at range
+        [("job_type", 1), ("metadata.scraped_at", -1)],
+        [("metadata.scraped_at", -1), ("_id", -1)]
+    ],
+    "profiles": [
+        [("metadata.scraped_at", -1), ("_id", -1)]
+    ]
+}
+
+# Index name -> creation options; queries must match them for the planner to
+# pick the index
+INDEX_OPTIONS = {
+    # Documents only get scraped_at once their scrape finishes, so anything
+    # unstamped stays out of the b-tree
+    "metadata.scraped_at_-1__id_-1": {
+        "partialFilterExpression": {"metadata.scraped_at": {"$exists": True}}
+    }
+}
+
+# Indexes created by earlier versions that the ones above replace
+OBSOLETE_INDEXES = {
+    "companies": ["name_1", "industry_1", "location_1", "metadata.scraped_at_-1"],
+    "jobs": ["job_title_1", "company_1", "company_1_job_title_1", "location_1", "job_type_1", "metadata.scraped_at_-1"],
+    "profiles": ["name_1", "skills_1", "location_1", "company_1", "metadata.scraped_at_-1"]
+}
+
+def _index_name(keys):
+    """Default name MongoDB gives an index with these keys"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+def _options_match(index, options):
+    """Whether an existing index was built with the wanted options"""
+    for option in ("partialFilterExpression", "collation"):
+        wanted, actual = options.get(option), index.get(option)
+        if wanted is None or actual is None:
+            if wanted is not actual:
+                return False
+        # The server reports every collation field, so compare just the ones we set
+        elif any(actual.get(key) != value for key, value in wanted.items()):
+            return False
+    return True
+
+def _find_text_index(existing):
+    """Return the existing text index, identified by its key type rather than its name"""
+    return next((idx for idx in existing.values() if TEXT in idx["key"].values()), None)
+
+async def _ensure_text_index(collection, existing, fields, weights):
+    """Return the text index model still to be created, or None if it is up to date"""
+    # A collection can have only one text index, so an existing one with
+    # different weights has to be dropped before the new one is built
+    text_index = _find_text_index(existing)
+    if text_index and text_index.get("weights") == weights:
+        print(f"Text index already exists on {collection.name} collection: {text_index['name']}")
+        return None
+    if text_index:
+        await collection.drop_index(text_index["name"])
+        print(f"Dropped outdated text index on {collection.name} collection: {text_index['name']}")
+    return IndexModel([(field, TEXT) for field in fields], weights=weights)
+
+async def _ensure_indexes(collection, existing_indexes):
+    """Create every missing index on a collection in one createIndexes command"""
+    existing = {idx["name"]: idx for idx in existing_indexes}
+    models = []
     
-    # Connect to MongoDB
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
-    db = client[settings.MONGODB_DB_NAME]
+    fields = TEXT_INDEX_FIELDS[collection.name]
+    weights = {field: TEXT_INDEX_WEIGHTS[collection.name].get(field, 1) for field in fields}
+    text_model = await _ensure_text_index(collection, existing, fields, weights)
+    if text_model:
+        models.append(text_model)
     
-    # Create text indexes for full-text search
-    try:
-        # First check if text index already exists on companies collection
-        existing_indexes = await db.companies.list_indexes().to_list(None)
-        has_text_index = False
-        
-        for idx in existing_indexes:
-            if "text" in idx.get("name", ""):
-                has_text_index = True
-                print(f"Text index already exists on companies collection: {idx['name']}")
-                break
-        
-        # Only create if no text index exists
-        if not has_text_index:
-            await db.companies.create_index([
-                ("name", "text"),
-                ("industry", "text"),
-                ("description", "text"),
-                ("location", "text"),
-                ("website", "text")
-            ])
-            print("Created text index on companies collection")
-    except Exception as e:
-        print(f"Error creating companies text index: {str(e)}")
-        # Continue with other indexes
+    for keys in REGULAR_INDEXES[collection.name]:
+        name = _index_name(keys)
+        options = INDEX_OPTIONS.get(name, {})
+        if name in existing:
+            if _options_match(existing[name], options):
+                continue
+            # Same keys with different options can't coexist, so rebuild it
+            await collection.drop_index(name)
+            print(f"Dropped outdated {name} index on {collection.name} collection")
+        models.append(IndexModel(keys, **options))
     
-    # Similar approach for jobs
-    try:
-        existing_indexes = await db.jobs.list_indexes().to_list(None)
-        has_text_index = False
-        
-        for idx in existing_indexes:
-            if "text" in idx.get("name", ""):
-                has_text_index = True
-                print(f"Text index already exists on jobs collection: {idx['name']}")
-                break
-                
-        if not has_text_index:
-            await db.jobs.create_index([
-                ("job_title", "text"),
-                ("company", "text"),
-                ("description", "text"),
-                ("location", "text"),
-                ("requirements", "text")
-            ])
-            print("Created text index on jobs collection")
-    except Exception as e:
-        print(f"Error creating jobs text index: {str(e)}")
+    if models:
+        await collection.create_indexes(models)
+        print(f"Created {len(models)} indexes on {collection.name} collection")
     
-    # Similar approach for profiles
-    try:
-        existing_indexes = await db.profiles.list_indexes().to_list(None)
-        has_text_index = False
-        
-        for idx in existing_indexes:
-            if "text" in idx.get("name", ""):
-                has_text_index = True
-                print(f"Text index already exists on profiles collection: {idx['name']}")
-                break
-                
-        if not has_text_index:
-            await db.profiles.create_index([
-                ("name", "text"),
-                ("headline", "text"),
-                ("about", "text"),
-                ("location", "text"),
-                ("skills", "text"),
-                ("company", "text")
-            ])
-            print("Created text index on profiles collection")
-    except Exception as e:
-        print(f"Error creating profiles text index: {str(e)}")
+    # Drop indexes that have been superseded so inserts stop maintaining them
+    obsolete = [name for name in OBSOLETE_INDEXES[collection.name] if name in existing]
+    if obsolete:
+        await asyncio.gather(*(collection.drop_index(name) for name in obsolete))
+        print(f"Dropped obsolete indexes on {collection.name} collection: {', '.join(obsolete)}")
+
+async def setup_indexes(db=None):
+    """Set up indexes for MongoDB collections (defaults to the app's database)"""
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    
+    print("Setting up MongoDB indexes...")
+    
+    if db is None:
+        db = get_database()
+    collections = [db.companies, db.jobs, db.profiles]
     
-    # Create other regular indexes - these can coexist with existing ones
     try:
-        # Companies regular indexes
-        await db.companies.create_index("name")
-        await db.companies.create_index("industry")
-        await db.companies.create_index("location")
-        
-        # Jobs regular indexes
-        await db.jobs.create_index("job_title")
-        await db.jobs.create_index("company")
-        await db.jobs.create_index("location")
-        await db.jobs.create_index("job_type")
+        # Skip the whole setup if this index version was already applied
+        marker = await db.meta.find_one({"_id": "indexes"})
+        if marker and marker.get("version") == INDEX_VERSION:
+            print(f"MongoDB indexes already at version {INDEX_VERSION}")
+            _indexes_ready = True
+            return
         
-        # Profiles regular indexes
-        await db.profiles.create_index("name")
-        await db.profiles.create_index("skills")
-        await db.profiles.create_index("location")
-        await db.profiles.create_index("company")
+        # Fetch existing indexes for all collections at once
+        existing = await asyncio.gather(
+            *(collection.list_indexes().to_list(None) for collection in collections)
+        )
         
-        # Create index on scraped_at for sorting
-        await db.companies.create_index([("metadata.scraped_at", -1)])
-        await db.jobs.create_index([("metadata.scraped_at", -1)])
-        await db.profiles.create_index([("metadata.scraped_at", -1)])
+        # Create missing indexes on each collection concurrently
+        results = await asyncio.gather(
+            *(_ensure_indexes(collection, indexes) for collection, indexes in zip(collections, existing)),
+            return_exceptions=True
+        )
+        for collection, result in zip(collections, results):
+            if isinstance(result, Exception):
+                print(f"Error creating {collection.name} indexes: {str(result)}")
+                # Continue with other collections
         
-        print("Regular indexes created successfully")
+        # Record the version only when every collection succeeded
+        if not any(isinstance(result, Exception) for result in results):
+            await db.meta.update_one(
+                {"_id": "indexes"},
+                {"$set": {"version": INDEX_VERSION, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            _indexes_ready = True
     except Exception as e:
-        print(f"Error creating regular indexes: {str(e)}")
+        print(f"Error listing indexes: {str(e)}")
     
     print("MongoDB indexes setup completed")
 
 # Run this script directly to set up indexes
+async def _main():
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        await setup_indexes(client[settings.MONGODB_DB_NAME])
+    finally:
+        client.close()
+
 if __name__ == "__main__":
-    asyncio.run(setup_indexes())
\ No newline at end of file
+    asyncio.run(_main())
\ No newline at end of file
@@ -1,26 +1,63 @@
+import asyncio
+import logging.config
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
-from app.api.routes import companies, profiles, jobs
+from fastapi.responses import ORJSONResponse
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database, BATCH_WRITERS
 from app.core.config import settings
 from app.core.middleware import RateLimitMiddleware
 from app.db.setup_indexes import setup_indexes
 
+# Configure logging once for the whole app
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(levelname)s:%(name)s:%(message)s"}
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"}
+    },
+    "root": {"level": "INFO", "handlers": ["console"]}
+})
+
 app = FastAPI(
     title="LinkedIn Scraper API",
     description="Production-ready LinkedIn scraping API with proxy rotation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+def _load_routes():
+    """Import the route modules, which pull in Selenium and the scrapers"""
+    from app.api.routes import companies, profiles, jobs
+    return companies, profiles, jobs
+
 # Connect to MongoDB on startup
 @app.on_event("startup")
 async def startup():
+    # Import the scraping stack while the MongoDB connection is being set up
+    routes = asyncio.get_running_loop().run_in_executor(None, _load_routes)
     await connect_to_mongo()
-    # Set up MongoDB indexes
-    await setup_indexes()
+    for writer in BATCH_WRITERS:
+        await writer.start()
+    # Set up MongoDB indexes over the same connection pool
+    await setup_indexes(get_database())
+    
+    # Include all API routes
+    companies, profiles, jobs = await routes
+    app.include_router(companies.router, prefix="/api/companies", tags=["companies"])
+    app.include_router(profiles.router, prefix="/api/profiles", tags=["profiles"])
+    app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.on_event("shutdown")
 async def shutdown():
+    from app.scrapers.company_scraper import close_all_scrapers
+    from app.scrapers.driver_pool import driver_pool
+    await driver_pool.close()
+    await close_all_scrapers()
+    for writer in BATCH_WRITERS:
+        await writer.stop()
     await close_mongo_connection()
 
 # Add middlewares
@@ -33,11 +70,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include all API routes
-app.include_router(companies.router, prefix="/api/companies", tags=["companies"])
-app.include_router(profiles.router, prefix="/api/profiles", tags=["profiles"])
-app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
-
 # Health check endpoint
 @app.get("/health", tags=["health"])
 async def health_check():
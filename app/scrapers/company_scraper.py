@@ -4,9 +4,12 @@ from datetime import datetime
 import logging
 import traceback
 import time
+import weakref
 from bson import ObjectId
 
-from app.db.mongodb import get_companies_collection, get_tasks_collection
+from app.db.mongodb import company_writer, update_task
+from app.scrapers.executor import SCRAPE_POOL
+from app.utils.id_helpers import company_name, normalize_name
 from utils.proxy_handler import ProxyHandler
 from utils.cookie_auth import LinkedInCookieAuth
 from linkedin_scraper.custom_company_scraper import CustomCompanyScraper
@@ -20,32 +23,56 @@ LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD')
 
 logger = logging.getLogger("app.scraper")
 
+# The formatter holds no per-scrape state, so every scraper shares one
+_FORMATTER = LinkedInFormatter()
+
+# Scrapers that may still hold a browser, closed on app shutdown
+_active_scrapers = weakref.WeakSet()
+
+async def _quit_driver(driver):
+    """Quit a WebDriver off the event loop; Chrome teardown can take seconds"""
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(SCRAPE_POOL, driver.quit)
+    except Exception as e:
+        logger.warning(f"Error closing WebDriver: {str(e)}")
+
+async def close_all_scrapers():
+    """Close the browsers of every scraper still alive and the scrape threads (called on app shutdown)"""
+    await asyncio.gather(*(scraper.aclose() for scraper in list(_active_scrapers)))
+    SCRAPE_POOL.shutdown(wait=False)
+
 class CompanyScraper:
     """Production-ready LinkedIn company scraper with proxy rotation"""
     
+    # Session cookies from the last verified login, shared by all scrapers
+    _cookie_cache = None
+    _cookie_cache_exp = 0.0
+    COOKIE_CACHE_TTL = 1800  # seconds before cached cookies are verified again
+    BACKOFF_BASE = 1.0  # seconds, minimum delay between attempts
+    BACKOFF_CAP = 30.0  # seconds, maximum delay between attempts
+    
     def __init__(self, proxy_file='utils/proxies.txt', headless=False):
         self.proxy_handler = ProxyHandler(proxy_file=proxy_file)
         self.driver = None
         self.current_proxy = None
         self.headless = True
         self.company_cache = {}
-        self.formatter = LinkedInFormatter()  # Initialize formatter
+        self.formatter = _FORMATTER
         self.auth = None  # Will be initialized during setup_driver
+        self.authenticated = False  # Whether self.driver holds a logged-in session
+        _active_scrapers.add(self)
     
         
     async def setup_driver(self):
         """Initialize or refresh the WebDriver with a new proxy"""
         # Close existing driver if any
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+        await self.aclose()
         
         # Create new driver with proxy using run_in_executor for async compatibility
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         self.driver, self.current_proxy = await loop.run_in_executor(
-            None,
+            SCRAPE_POOL,
             lambda: self.proxy_handler.create_driver(use_proxy=True, headless=True)  # Force headless=True for server
         )
         
@@ -53,7 +80,7 @@ class CompanyScraper:
             # If proxy failed, try without proxy as fallback
             logger.warning("Failed to create driver with proxy. Trying without proxy.")
             self.driver, _ = await loop.run_in_executor(
-                None,
+                SCRAPE_POOL,
                 lambda: self.proxy_handler.create_driver(use_proxy=False, headless=True)  # Force headless=True for server
             )
             
@@ -63,67 +90,83 @@ class CompanyScraper:
             
         return self.driver is not None
 
+    @classmethod
+    def _cache_cookies(cls, driver):
+        cls._cookie_cache = driver.get_cookies()
+        cls._cookie_cache_exp = time.monotonic() + cls.COOKIE_CACHE_TTL
+
     async def authenticate(self):
         """Improved authentication with better error handling"""
         if not self.driver or not self.auth:
             logger.error("Driver or auth not initialized")
             return False
         
-        # First try with direct connection (no proxy) for authentication
+        loop = asyncio.get_running_loop()
         original_proxy = self.current_proxy
         original_driver = self.driver
         
         try:
-            logger.info("Creating direct connection for authentication")
-            loop = asyncio.get_event_loop()
-            self.driver, _ = await loop.run_in_executor(
-                None,
-                lambda: self.proxy_handler.create_driver(use_proxy=False, headless=True)  # Force headless=True for server
-            )
-            self.auth = LinkedInCookieAuth(self.driver)
+            # Recently verified cookies are trusted without another login check
+            cookies = CompanyScraper._cookie_cache
+            if cookies and time.monotonic() < CompanyScraper._cookie_cache_exp:
+                await loop.run_in_executor(SCRAPE_POOL, lambda: self.auth.apply_cookies(self.driver, cookies))
+                logger.info("Authenticated with cached session cookies")
+                return True
             
-            # Try cookie authentication
+            # Try cookie authentication on the current driver
             if os.path.exists(self.auth.cookie_file):
                 logger.info(f"Attempting login with cookies from {self.auth.cookie_file}")
                 auth_result = await loop.run_in_executor(
-                    None,
+                    SCRAPE_POOL,
                     lambda: self.auth.load_cookies(self.driver) and self.auth.verify_login(self.driver)
                 )
                 if auth_result:
                     logger.info("Successfully authenticated with cookies")
+                    await loop.run_in_executor(SCRAPE_POOL, lambda: self._cache_cookies(self.driver))
                     return True
             
-            # If cookie auth fails, try credentials
+            # If cookie auth fails, log in with credentials over a direct connection
             if LINKEDIN_USER and LINKEDIN_PASSWORD:
+                logger.info("Creating direct connection for authentication")
+                self.driver, _ = await loop.run_in_executor(
+                    SCRAPE_POOL,
+                    lambda: self.proxy_handler.create_driver(use_proxy=False, headless=True)  # Force headless=True for server
+                )
+                self.auth = LinkedInCookieAuth(self.driver)
+                
                 logger.info("Attempting login with credentials")
                 result = await loop.run_in_executor(
-                    None,
+                    SCRAPE_POOL,
                     lambda: self.auth.authenticate_with_credentials(LINKEDIN_USER, LINKEDIN_PASSWORD)
                 )
                 if result:
                     logger.info("Successfully logged in with credentials")
                     # Save cookies for future use
                     await loop.run_in_executor(
-                        None,
+                        SCRAPE_POOL,
                         lambda: self.auth.save_cookies(driver=self.driver)
                     )
+                    await loop.run_in_executor(SCRAPE_POOL, lambda: self._cache_cookies(self.driver))
+                    # The direct driver replaces the proxied one
+                    await _quit_driver(original_driver)
                     return True
                     
-            # If direct connection fails, try with proxy as fallback
-            if original_proxy:
-                logger.info(f"Trying authentication with original proxy: {original_proxy}")
-                await loop.run_in_executor(None, lambda: self.driver.quit() if self.driver else None)
-                self.driver = original_driver
-                self.auth = LinkedInCookieAuth(self.driver)
-                
-                # Try credentials with proxy
-                if LINKEDIN_USER and LINKEDIN_PASSWORD:
+                # If direct connection fails, try with proxy as fallback
+                if original_proxy:
+                    logger.info(f"Trying authentication with original proxy: {original_proxy}")
+                    if self.driver:
+                        await _quit_driver(self.driver)
+                    self.driver = original_driver
+                    self.auth = LinkedInCookieAuth(self.driver)
+                    
+                    # Try credentials with proxy
                     result = await loop.run_in_executor(
-                        None,
+                        SCRAPE_POOL,
                         lambda: self.auth.authenticate_with_credentials(LINKEDIN_USER, LINKEDIN_PASSWORD)
                     )
                     if result:
                         logger.info("Successfully logged in with credentials using proxy")
+                        await loop.run_in_executor(SCRAPE_POOL, lambda: self._cache_cookies(self.driver))
                         return True
                         
         except Exception as e:
@@ -132,10 +175,8 @@ class CompanyScraper:
             
             # Restore original driver if needed
             if self.driver != original_driver:
-                try:
-                    await loop.run_in_executor(None, lambda: self.driver.quit() if self.driver else None)
-                except:
-                    pass
+                if self.driver:
+                    await _quit_driver(self.driver)
                 self.driver = original_driver
                 self.auth = LinkedInCookieAuth(self.driver)
         
@@ -143,122 +184,149 @@ class CompanyScraper:
         return False
 
         
+    async def ensure_ready_driver(self):
+        """Reuse the current authenticated driver, creating and logging in a new one only when needed"""
+        if self.driver and self.authenticated:
+            loop = asyncio.get_running_loop()
+            try:
+                # Cheap liveness probe; avoids relaunching Chrome and logging in again
+                await loop.run_in_executor(SCRAPE_POOL, lambda: self.driver.current_url)
+                return True
+            except Exception:
+                logger.warning("Existing WebDriver is no longer responsive, creating a new one")
+        
+        self.authenticated = False
+        if not await self.setup_driver():
+            return False
+        self.authenticated = await self.authenticate()
+        return self.authenticated
+
     async def scrape_company(self, url, task_id=None, include_employees=True):
         """Scrape company with retry logic and proxy rotation"""
         max_retries = 3
         retries = 0
+        delay = self.BACKOFF_BASE
         
         # Update task to "in_progress" immediately
-        await self.update_task(task_id, "in_progress", error=None)
+        await update_task(task_id, "in_progress", error=None)
         
         # Add timeout protection
-        start_time = time.time()
+        start_time = time.monotonic()  # immune to wall-clock adjustments
         max_execution_time = 300  # 5 minutes max per company
+        loop = asyncio.get_running_loop()
         
         while retries < max_retries:
             try:
                 # Check timeout
-                if time.time() - start_time > max_execution_time:
-                    await self.update_task(task_id, "failed", error="Task timed out after 5 minutes")
+                if time.monotonic() - start_time > max_execution_time:
+                    await update_task(task_id, "failed", error="Task timed out after 5 minutes")
                     logger.error(f"Scraping timed out for {url}")
                     return None
 
-                # Setup driver
-                if not await self.setup_driver():
-                    await self.update_task(task_id, "failed", error="Failed to initialize WebDriver")
-                    return None
-                    
-                # Authenticate
-                if not await self.authenticate():
-                    await self.update_task(task_id, "failed", error="Authentication failed")
+                # Reuse the authenticated driver, or set up and log in a new one
+                if not await self.ensure_ready_driver():
+                    error = "Failed to initialize WebDriver" if not self.driver else "Authentication failed"
+                    await update_task(task_id, "failed", error=error)
                     return None
                     
                 # Run the scraping
                 logger.info(f"Scraping company: {url}, attempt {retries+1}/{max_retries}")
-                loop = asyncio.get_event_loop()
                 
                 # Create scraper and run
                 custom_scraper = CustomCompanyScraper(self.driver)
                 company_data = await loop.run_in_executor(
-                    None,
+                    SCRAPE_POOL,
                     lambda: custom_scraper.scrape_company(url)
                 )
                 
-                # More frequent status updates
-                await self.update_task(task_id, "processing", error=None)
-                
                 if company_data:
+                    # One UTC timestamp for both the document and its task
+                    now = datetime.utcnow()
+                    
                     # Insert into MongoDB
+                    company_data["name_lower"] = normalize_name(company_name(company_data))
                     company_data["metadata"] = {
-                        "scraped_at": datetime.now(),
+                        "scraped_at": now,
                         "url": url,
                         "task_id": str(task_id) if task_id else None
                     }
                     
-                    collection = get_companies_collection()
-                    result = await collection.insert_one(company_data)
+                    # Batched with inserts from concurrent scrapes
+                    company_id = company_data["_id"] = ObjectId()
+                    await company_writer.insert(company_data)
                     
                     # Update task status
-                    await self.update_task(task_id, "completed", result_id=result.inserted_id)
+                    await update_task(task_id, "completed", result_id=company_id, updated_at=now)
                     
                     # Return the scraped data
-                    company_data["_id"] = str(result.inserted_id)
+                    company_data["_id"] = str(company_id)
                     logger.info(f"Successfully scraped company: {url}")
                     return company_data
                     
+                # Still working on it; a successful scrape goes straight to "completed"
+                await update_task(task_id, "processing", error=None)
                 logger.warning(f"No data returned for {url}")
                 
             except Exception as e:
                 logger.error(f"Error scraping {url}: {str(e)}")
                 logger.error(traceback.format_exc())
                 
-                # Mark current proxy as failed
+                # Mark current proxy as failed and rotate to a new driver on retry
                 if self.current_proxy:
                     await loop.run_in_executor(
-                        None,
+                        SCRAPE_POOL,
                         lambda: self.proxy_handler.mark_proxy_as_failed(self.current_proxy)
                     )
+                self.authenticated = False
                     
                 # Retry with new proxy
                 retries += 1
                 if retries < max_retries:
                     logger.info(f"Retrying with new proxy (attempt {retries+1}/{max_retries})")
-                    # Use exponential backoff
-                    delay = 2 ** retries + random.uniform(0, 1)
+                    # Decorrelated jitter keeps concurrent retries from lining up
+                    delay = min(self.BACKOFF_CAP, random.uniform(self.BACKOFF_BASE, delay * 3))
+                    # The stale driver is replaced on retry anyway, so free it while waiting
+                    await self.aclose()
                     await asyncio.sleep(delay)
                 else:
                     logger.error(f"Max retries reached for {url}")
-                    await self.update_task(task_id, "failed", error=f"Failed after {max_retries} attempts")
+                    await update_task(task_id, "failed", error=f"Failed after {max_retries} attempts")
                     
         return None
         
-    async def update_task(self, task_id, status, result_id=None, error=None):
-        """Update task status in MongoDB"""
-        if not task_id:
-            return
-            
-        tasks_collection = get_tasks_collection()
-        update_data = {
-            "status": status,
-            "updated_at": datetime.now()
-        }
+    async def scrape_many(self, urls, task_ids=None, max_concurrency=4):
+        """Scrape several companies concurrently, each worker driving its own browser"""
+        task_ids = task_ids or [None] * len(urls)
         
-        if result_id:
-            update_data["result_id"] = str(result_id)
+        # Selenium drivers are not thread-safe, so every concurrent scrape
+        # borrows a whole scraper (and its driver) from the pool
+        pool = asyncio.Queue()
+        workers = [self] + [
+            CompanyScraper(headless=self.headless)
+            for _ in range(min(max_concurrency, len(urls)) - 1)
+        ]
+        for worker in workers:
+            pool.put_nowait(worker)
         
-        if error:
-            update_data["error"] = error
-            
-        # Don't try to convert string UUID to ObjectId
-        await tasks_collection.update_one(
-            {"_id": task_id},
-            {"$set": update_data}
-        )
-        
-    def __del__(self):
-        """Clean up resources"""
-        if self.driver:
+        async def _one(url, task_id):
+            worker = await pool.get()
             try:
-                self.driver.quit()
-            except:
-                pass
\ No newline at end of file
+                return await worker.scrape_company(url, task_id)
+            finally:
+                pool.put_nowait(worker)
+        
+        try:
+            return await asyncio.gather(
+                *(_one(url, task_id) for url, task_id in zip(urls, task_ids)),
+                return_exceptions=True
+            )
+        finally:
+            # Only the extra workers are torn down; this scraper keeps its driver
+            await asyncio.gather(*(worker.aclose() for worker in workers[1:]))
+        
+    async def aclose(self):
+        """Quit the WebDriver without blocking the event loop"""
+        driver, self.driver = self.driver, None
+        self.authenticated = False
+        if driver:
+            await _quit_driver(driver)
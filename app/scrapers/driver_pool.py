@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+
+from selenium.common.exceptions import WebDriverException
+
+from app.core.config import settings
+from app.scrapers.executor import SCRAPE_POOL
+from utils.proxy_handler import ProxyHandler
+from utils.cookie_auth import LinkedInCookieAuth
+
+logger = logging.getLogger("app.scraper")
+
+class DriverUnavailable(Exception):
+    """Raised when no authenticated WebDriver could be created"""
+
+class PooledDriver:
+    """A warm WebDriver together with the proxy it was created with"""
+    
+    # Human-like pause between page loads on one driver, in seconds
+    PACE_MIN = 1.0
+    PACE_MAX = 3.0
+    
+    def __init__(self, driver, proxy):
+        self.driver = driver
+        self.proxy = proxy
+        self.next_available = 0.0  # monotonic time its next page load may start
+        self.helpers = {}  # page helpers scrapers build around this driver, reused across borrows
+    
+    def pace(self):
+        """Start this driver's pause after a page load without holding anyone up"""
+        self.next_available = time.monotonic() + random.uniform(self.PACE_MIN, self.PACE_MAX)
+    
+    async def wait_turn(self):
+        """Wait out whatever is left of this driver's pause"""
+        delay = self.next_available - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class WebDriverPool:
+    """Process-wide pool of authenticated WebDrivers shared by the job and profile scrapers"""
+    
+    AUTH_TTL = 600  # seconds a verified login's cookies are reused without checking
+    
+    def __init__(self, size=4):
+        self.size = size
+        self.slots = None  # one per driver that may be borrowed at once
+        self.idle = None
+        self.proxy_handler = None
+        self.auth_lock = None
+        self.session_cookies = None
+        self.session_verified_at = 0.0
+    
+    @asynccontextmanager
+    async def acquire(self, wait=True):
+        """Borrow a driver; with wait=False, only an idle one is taken (else None is yielded)
+        
+        A driver whose scrape raised a WebDriverException is discarded (its
+        proxy marked as failed) instead of going back to the pool.
+        """
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.size)
+            self.idle = asyncio.Queue()
+            self.auth_lock = asyncio.Lock()
+        
+        if not wait and (self.slots.locked() or self.idle.empty()):
+            yield None
+            return
+        
+        # Idle drivers plus borrowed ones never exceed the pool size: a new
+        # driver is only started when a slot is free and none is idle
+        await self.slots.acquire()
+        try:
+            entry = self.idle.get_nowait() if not self.idle.empty() else await self._create()
+        except BaseException:
+            self.slots.release()
+            raise
+        
+        # Each driver keeps its own pace, so waits on different drivers overlap
+        try:
+            await entry.wait_turn()
+        except BaseException:
+            self.idle.put_nowait(entry)
+            self.slots.release()
+            raise
+        
+        try:
+            yield entry
+        except WebDriverException:
+            # The browser or its proxy broke; the next borrow gets a fresh one
+            await self._discard(entry)
+            raise
+        except asyncio.CancelledError:
+            # The scrape may still be running on its thread, so the driver
+            # can't be handed out again; its proxy is not to blame though
+            await self._discard(entry, mark_failed=False)
+            raise
+        except BaseException:
+            # Not a browser failure (e.g. a bug in the caller); keep the driver
+            await self._release(entry)
+            raise
+        else:
+            await self._release(entry)
+        finally:
+            self.slots.release()
+    
+    async def _create(self):
+        """Start a driver (proxied if possible) and log it in to LinkedIn"""
+        loop = asyncio.get_running_loop()
+        if self.proxy_handler is None:
+            self.proxy_handler = ProxyHandler()
+        
+        driver, proxy = await loop.run_in_executor(
+            SCRAPE_POOL,
+            partial(self.proxy_handler.create_driver, use_proxy=True, headless=True)
+        )
+        if not driver:
+            logger.warning("Failed to create driver with proxy. Trying without proxy.")
+            driver, proxy = await loop.run_in_executor(
+                SCRAPE_POOL,
+                partial(self.proxy_handler.create_driver, use_proxy=False, headless=True)
+            )
+        if not driver:
+            raise DriverUnavailable("Failed to initialize WebDriver")
+        
+        if not await self._authenticate(driver):
+            await loop.run_in_executor(SCRAPE_POOL, driver.quit)
+            raise DriverUnavailable("Authentication failed")
+        
+        logger.info("Added WebDriver to pool")
+        return PooledDriver(driver, proxy)
+    
+    async def _authenticate(self, driver):
+        """Authenticate to LinkedIn, logging in at most once for concurrent callers"""
+        async with self.auth_lock:
+            auth = LinkedInCookieAuth(driver)
+            loop = asyncio.get_running_loop()
+            
+            # Reuse the session another driver just verified
+            if self.session_cookies and time.monotonic() - self.session_verified_at < self.AUTH_TTL:
+                await loop.run_in_executor(SCRAPE_POOL, partial(auth.apply_cookies, driver, self.session_cookies))
+                logger.info("Authenticated with the pool's session cookies")
+                return True
+            
+            if await self._login(auth, driver):
+                self.session_cookies = await loop.run_in_executor(SCRAPE_POOL, driver.get_cookies)
+                self.session_verified_at = time.monotonic()
+                return True
+            return False
+    
+    async def _login(self, auth, driver):
+        """Authenticate to LinkedIn with cookies or login"""
+        loop = asyncio.get_running_loop()
+        
+        # Try cookie auth first
+        try:
+            cookie_result = await loop.run_in_executor(
+                SCRAPE_POOL,
+                lambda: auth.load_cookies(driver) and auth.verify_login(driver)
+            )
+            if cookie_result:
+                logger.info("Successfully authenticated with cookies")
+                return True
+        except Exception as e:
+            logger.error(f"Cookie authentication failed: {str(e)}")
+        
+        # Try credentials if available
+        if settings.LINKEDIN_USER and settings.LINKEDIN_PASSWORD:
+            try:
+                result = await loop.run_in_executor(
+                    SCRAPE_POOL,
+                    partial(auth.get_manual_login, driver, settings.LINKEDIN_USER, settings.LINKEDIN_PASSWORD)
+                )
+                if result:
+                    logger.info("Successfully authenticated with credentials")
+                    return True
+            except Exception as e:
+                logger.error(f"Credentials authentication failed: {str(e)}")
+        
+        return False
+    
+    async def _release(self, entry):
+        """Park a healthy driver on a blank page, keeping its session cookies"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(SCRAPE_POOL, partial(entry.driver.get, "about:blank"))
+        except Exception as e:
+            logger.warning(f"Discarding unresponsive WebDriver: {str(e)}")
+            await self._discard(entry)
+            return
+        entry.pace()
+        self.idle.put_nowait(entry)
+    
+    async def _discard(self, entry, mark_failed=True):
+        """Drop a driver from the pool, so the next acquire creates a fresh one"""
+        loop = asyncio.get_running_loop()
+        if mark_failed and entry.proxy:
+            try:
+                # Off the event loop: marking writes to the shared proxy state file
+                await loop.run_in_executor(SCRAPE_POOL, partial(self.proxy_handler.mark_proxy_as_failed, entry.proxy))
+            except Exception as e:
+                logger.warning(f"Error marking proxy as failed: {str(e)}")
+        try:
+            await loop.run_in_executor(SCRAPE_POOL, entry.driver.quit)
+        except Exception as e:
+            logger.warning(f"Error closing WebDriver: {str(e)}")
+    
+    async def close(self):
+        """Quit every idle driver (called on app shutdown)"""
+        while self.idle and not self.idle.empty():
+            entry = self.idle.get_nowait()
+            try:
+                await asyncio.get_running_loop().run_in_executor(SCRAPE_POOL, entry.driver.quit)
+            except Exception as e:
+                logger.warning(f"Error closing WebDriver: {str(e)}")
+
+driver_pool = WebDriverPool(size=settings.DRIVER_POOL_SIZE)
@@ -0,0 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+
+# Selenium calls block on the browser, so the scrapers run them on their own
+# threads rather than competing with the loop's default executor
+SCRAPE_POOL = ThreadPoolExecutor(max_workers=settings.SCRAPER_WORKERS, thread_name_prefix="scrape")
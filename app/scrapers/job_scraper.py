@@ -1,15 +1,19 @@
 import asyncio
 import os
+import re
 import time
-import random
 from datetime import datetime
 import logging
 import traceback
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from functools import partial
 from bson import ObjectId
 
-from app.db.mongodb import get_jobs_collection, get_tasks_collection
-from utils.proxy_handler import ProxyHandler
-from utils.cookie_auth import LinkedInCookieAuth
+from app.db.mongodb import job_writer, update_task
+from app.scrapers.driver_pool import driver_pool, DriverUnavailable
+from app.scrapers.executor import SCRAPE_POOL
+from app.utils.id_helpers import normalize_name
 from linkedin_scraper.custom_job_scraper import CustomJobScraper
 from linkedin_scraper.company_scraper_integration import CompanyScraperIntegration
 from dataformatter.job_formatter import JobFormatter
@@ -17,14 +21,17 @@ from dataformatter.data_formatter import LinkedInFormatter
 
 logger = logging.getLogger("app.scraper")
 
+# Runs of anything that isn't safe in a file name
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+def _slug(value):
+    """Lowercase, filesystem-safe form of a search term or job field"""
+    return _SLUG_RE.sub("_", (value or "").lower()).strip("_")
+
 class JobScraper:
     """Production-ready LinkedIn job scraper with proxy rotation"""
     
     def __init__(self, save_to_file=False, output_dir='scraped_data'):
-        self.proxy_handler = ProxyHandler()
-        self.driver = None
-        self.current_proxy = None
-        self.headless = True  # Always headless in production
         self.save_to_file = save_to_file
         self.output_dir = output_dir
         
@@ -32,247 +39,214 @@ class JobScraper:
         self.job_formatter = JobFormatter(output_dir=output_dir)
         self.data_formatter = LinkedInFormatter()
         
+        # Company lookups keyed by normalized name, shared by all of this
+        # scraper's pipelines (many listings come from the same company)
+        self._company_url_cache = {}
+        self._company_data_cache = {}
+        self._company_locks = defaultdict(asyncio.Lock)
+        
         # Create output directory if needed
         if save_to_file:
             os.makedirs(output_dir, exist_ok=True)
         
-    async def setup_driver(self):
-        """Initialize WebDriver with proxy rotation and timeout protection"""
-        # Add timeout to prevent stuck drivers
+    async def _process_one_job(self, scrapers, job_data, base_metadata):
+        """Scrape details (and company data) for one search result on a free driver"""
+        entry, job_scraper, company_scraper = await scrapers.get()
+        loop = asyncio.get_running_loop()
         try:
-            return await asyncio.wait_for(
-                self._setup_driver_internal(), 
-                timeout=30.0  # 30 second timeout for driver setup
+            await entry.wait_turn()
+            
+            # Get detailed job info
+            detailed_job = await loop.run_in_executor(
+                SCRAPE_POOL,
+                partial(job_scraper.get_job_details, job_data)
+            )
+            
+            # Add company data if requested
+            if company_scraper and detailed_job.get("company", ""):
+                detailed_job = await self._attach_company(company_scraper, detailed_job)
+            
+            # Format job data on a scrape thread; parsing descriptions is CPU work
+            formatted_job = await loop.run_in_executor(
+                SCRAPE_POOL,
+                partial(self.job_formatter.format_job_data, detailed_job)
             )
-        except asyncio.TimeoutError:
-            logger.error("Driver setup timed out")
-            return False
+            
+            # Lookup keys for id_helpers
+            formatted_job["job_title_lower"] = normalize_name(formatted_job.get("job_title"))
+            formatted_job["company_lower"] = normalize_name(formatted_job.get("company"))
+            
+            # Add metadata, shared by every job of the search
+            formatted_job["metadata"] = dict(base_metadata)
+            
+            logger.info(f"Successfully scraped job: {formatted_job['job_title']}")
+            return formatted_job
+            
+        except Exception as e:
+            logger.error(f"Error processing job: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+        finally:
+            # The driver's pause runs while other pipelines use other drivers
+            entry.pace()
+            scrapers.put_nowait((entry, job_scraper, company_scraper))
         
-    async def _setup_driver_internal(self):
-        """Internal method for setting up WebDriver"""
-        # Close existing driver if any
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
-                
-        # Create new driver with proxy
-        loop = asyncio.get_event_loop()
-        self.driver, self.current_proxy = await loop.run_in_executor(
-            None, 
-            lambda: self.proxy_handler.create_driver(use_proxy=True, headless=self.headless)
-        )
+    async def _attach_company(self, company_scraper, detailed_job):
+        """Add the company URL and details to a job, resolving each company only once"""
+        company_name = detailed_job["company"]
+        key = company_name.strip().lower()
+        loop = asyncio.get_running_loop()
         
-        if not self.driver:
-            logger.warning("Failed to create driver with proxy. Trying without proxy.")
-            self.driver, _ = await loop.run_in_executor(
-                None,
-                lambda: self.proxy_handler.create_driver(use_proxy=False, headless=self.headless)
+        # Single-flight: pipelines for the same company wait for the first one
+        async with self._company_locks[key]:
+            if key not in self._company_url_cache:
+                # Generate URL directly from name
+                self._company_url_cache[key] = await loop.run_in_executor(
+                    SCRAPE_POOL,
+                    partial(company_scraper.url_extractor.generate_url_from_name, company_name)
+                )
+                if self._company_url_cache[key]:
+                    logger.info(f"Generated company URL from name: {self._company_url_cache[key]}")
+            
+            company_url = self._company_url_cache[key]
+            if not company_url:
+                return detailed_job
+            detailed_job["company_linkedin_url"] = company_url
+            
+            if key in self._company_data_cache:
+                detailed_job["company_data"] = self._company_data_cache[key]
+                return detailed_job
+            
+            # Get company details for the job
+            detailed_job = await loop.run_in_executor(
+                SCRAPE_POOL,
+                partial(company_scraper.scrape_company_for_job, detailed_job)
             )
+            if "company_data" in detailed_job:
+                self._company_data_cache[key] = detailed_job["company_data"]
+            return detailed_job
+    
+    def _scrapers_for(self, entry, include_company_data):
+        """Job and company scrapers for a pooled driver, built once per driver"""
+        if "job_scraper" not in entry.helpers:
+            entry.helpers["job_scraper"] = CustomJobScraper(entry.driver)
+        if include_company_data and "company_scraper" not in entry.helpers:
+            entry.helpers["company_scraper"] = CompanyScraperIntegration(entry.driver, self.data_formatter)
+        return entry.helpers["job_scraper"], entry.helpers.get("company_scraper") if include_company_data else None
+    
+    async def _search_with_driver(self, entry, keywords, location, limit, task_id, include_company_data):
+        """Run one job search attempt on a pooled driver"""
+        loop = asyncio.get_running_loop()
+        job_scraper, company_scraper = self._scrapers_for(entry, include_company_data)
         
-        return self.driver is not None
+        # Get basic job data from search results
+        job_results = await loop.run_in_executor(
+            SCRAPE_POOL,
+            partial(job_scraper.search_jobs, keywords, location, limit)
+        )
         
-    async def authenticate(self):
-        """Authenticate to LinkedIn with cookies or login"""
-        if not self.driver:
-            return False
-            
-        from app.core.config import settings
+        logger.info(f"Found {len(job_results)} job results for '{keywords}' in {location}")
         
-        auth = LinkedInCookieAuth(self.driver)
-        loop = asyncio.get_event_loop()
+        if job_results:
+            # Each result's pipeline borrows a free driver; every driver
+            # works through one job at a time
+            scrapers = asyncio.Queue()
+            entry.pace()
+            scrapers.put_nowait((entry, job_scraper, company_scraper))
+            
+            async with AsyncExitStack() as stack:
+                # Spread the results over any drivers sitting idle in the pool
+                for _ in range(len(job_results) - 1):
+                    extra = await stack.enter_async_context(driver_pool.acquire(wait=False))
+                    if extra is None:
+                        break
+                    scrapers.put_nowait((extra, *self._scrapers_for(extra, include_company_data)))
+                
+                # Process jobs with details, stamped with one timestamp per search
+                base_metadata = {
+                    "scraped_at": datetime.utcnow(),
+                    "search_keywords": keywords,
+                    "search_location": location,
+                    "task_id": task_id
+                }
+                results = await asyncio.gather(*(
+                    self._process_one_job(scrapers, job_data, base_metadata)
+                    for job_data in job_results
+                ))
+            return [job for job in results if job]
+        return []
+    
+    async def _save_jobs(self, detailed_jobs, keywords, location, task_id):
+        """Save a search's scraped jobs to file and MongoDB and complete its task"""
+        loop = asyncio.get_running_loop()
         
-        # Try cookie auth first
-        try:
-            # Check if cookies file exists and load them
-            cookie_result = await loop.run_in_executor(
-                None,
-                lambda: auth.load_cookies(self.driver) and auth.verify_login(self.driver)
+        # Save to file if requested
+        if self.save_to_file and detailed_jobs:
+            search_term_filename = f"jobs_{_slug(keywords)}_{_slug(location)}"
+            await loop.run_in_executor(
+                SCRAPE_POOL,
+                partial(self.job_formatter.save_to_json, detailed_jobs, search_term_filename)
             )
-            if cookie_result:
-                logger.info("Successfully authenticated with cookies")
-                return True
-        except Exception as e:
-            logger.error(f"Cookie authentication failed: {str(e)}")
         
-        # Try credentials if available
-        if settings.LINKEDIN_USER and settings.LINKEDIN_PASSWORD:
-            try:
-                result = await loop.run_in_executor(
-                    None,
-                    lambda: auth.get_manual_login(self.driver, settings.LINKEDIN_USER, settings.LINKEDIN_PASSWORD)
-                )
-                if result:
-                    logger.info("Successfully authenticated with credentials")
-                    return True
-            except Exception as e:
-                logger.error(f"Credentials authentication failed: {str(e)}")
-                
-        return False
+        # Save to MongoDB, batched with inserts from concurrent scrapes
+        if detailed_jobs:
+            for job in detailed_jobs:
+                job["_id"] = ObjectId()
+            inserted = await asyncio.gather(
+                *(job_writer.insert(job) for job in detailed_jobs),
+                return_exceptions=True
+            )
             
-    async def update_task(self, task_id, status, result_id=None, result_ids=None, count=None, error=None):
-        """Update task status in MongoDB"""
-        if not task_id:
-            return
+            # A rejected document doesn't cost the search the ones that were saved
+            failures = [error for error in inserted if isinstance(error, Exception)]
+            if len(failures) == len(detailed_jobs):
+                raise failures[0]
+            if failures:
+                logger.error(f"Failed to save {len(failures)} of {len(detailed_jobs)} jobs: {str(failures[0])}")
+                detailed_jobs = [job for job, error in zip(detailed_jobs, inserted) if not isinstance(error, Exception)]
+            job_ids = [job["_id"] for job in detailed_jobs]
             
-        tasks_collection = get_tasks_collection()
-        update_data = {
-            "status": status,
-            "updated_at": datetime.now()
-        }
-        
-        if result_id:
-            update_data["result_id"] = str(result_id)
+            # Update task status
+            await update_task(
+                task_id, 
+                "completed",
+                result_ids=job_ids,
+                count=len(detailed_jobs)
+            )
             
-        if result_ids:
-            update_data["result_ids"] = [str(id) for id in result_ids]
+            # Add MongoDB IDs to the job data
+            for job in detailed_jobs:
+                job["_id"] = str(job["_id"])
             
-        if count is not None:
-            update_data["count"] = count
-        
-        if error:
-            update_data["error"] = error
-            
-        await tasks_collection.update_one(
-            {"_id": task_id},
-            {"$set": update_data}
-        )
+            return detailed_jobs
         
+        # If we got here with no jobs, log a warning
+        logger.warning(f"No jobs found for '{keywords}' in {location}")
+        await update_task(task_id, "completed", count=0)
+        return []
+    
     async def search_jobs(self, keywords, location=None, limit=20, task_id=None, include_company_data=True):
         """Search and scrape jobs with retry logic and proxy rotation"""
         max_retries = 3
         retries = 0
         
         # Update task to in_progress immediately
-        await self.update_task(task_id, "in_progress", error=None)
+        await update_task(task_id, "in_progress", error=None)
         
         while retries < max_retries:
             try:
-                # Setup driver if needed
-                if not self.driver:
-                    if not await self.setup_driver():
-                        await self.update_task(task_id, "failed", error="Failed to initialize WebDriver")
-                        return None
-                    
-                # Authenticate with LinkedIn
-                if not await self.authenticate():
-                    await self.update_task(task_id, "failed", error="Authentication failed")
-                    return None
-                    
-                # Run the scraping
                 logger.info(f"Searching jobs: '{keywords}' in {location}, attempt {retries+1}/{max_retries}")
-                loop = asyncio.get_event_loop()
-                
-                # Initialize our custom job scraper
-                job_scraper = CustomJobScraper(self.driver)
-                
-                # Initialize company scraper integration if needed
-                if include_company_data:
-                    company_scraper = CompanyScraperIntegration(self.driver, self.data_formatter)
-                
-                # Get basic job data from search results
-                job_results = await loop.run_in_executor(
-                    None,
-                    lambda: job_scraper.search_jobs(keywords, location, limit)
-                )
-                
-                logger.info(f"Found {len(job_results)} job results for '{keywords}' in {location}")
-                
-                if job_results:
-                    # Process jobs with details
-                    detailed_jobs = []
-                    for job_data in job_results:
-                        try:
-                            # Get detailed job info
-                            detailed_job = await loop.run_in_executor(
-                                None,
-                                lambda: job_scraper.get_job_details(job_data)
-                            )
-                            
-                            # Add company data if requested
-                            if include_company_data:
-                                # Generate company URL from company name
-                                company_name = detailed_job.get("company", "")
-                                if company_name:
-                                    # Generate URL directly from name
-                                    company_url = await loop.run_in_executor(
-                                        None,
-                                        lambda: company_scraper.url_extractor.generate_url_from_name(company_name)
-                                    )
-                                    
-                                    if company_url:
-                                        detailed_job["company_linkedin_url"] = company_url
-                                        logger.info(f"Generated company URL from name: {company_url}")
-                                        
-                                        # Get company details for the job
-                                        detailed_job = await loop.run_in_executor(
-                                            None,
-                                            lambda: company_scraper.scrape_company_for_job(detailed_job)
-                                        )
-                            
-                            # Format job data
-                            formatted_job = self.job_formatter.format_job_data(detailed_job)
-                            
-                            # Add metadata
-                            formatted_job["metadata"] = {
-                                "scraped_at": datetime.now(),
-                                "search_keywords": keywords,
-                                "search_location": location,
-                                "task_id": task_id
-                            }
-                            
-                            detailed_jobs.append(formatted_job)
-                            logger.info(f"Successfully scraped job: {formatted_job['job_title']}")
-                            
-                            # Add delay between jobs
-                            await asyncio.sleep(random.uniform(1, 3))
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing job: {str(e)}")
-                            logger.error(traceback.format_exc())
-                    
-                    # Save to file if requested
-                    if self.save_to_file and detailed_jobs:
-                        search_term_filename = f"jobs_{keywords.replace(' ', '_')}_{location.replace(' ', '_')}".lower()
-                        await loop.run_in_executor(
-                            None,
-                            lambda: self.job_formatter.save_to_json(detailed_jobs, search_term_filename)
-                        )
-                    
-                    # Save to MongoDB
-                    if detailed_jobs:
-                        collection = get_jobs_collection()
-                        result = await collection.insert_many(detailed_jobs)
-                        
-                        # Update task status
-                        await self.update_task(
-                            task_id, 
-                            "completed",
-                            result_ids=result.inserted_ids if result else None,
-                            count=len(detailed_jobs)
-                        )
-                        
-                        # Add MongoDB IDs to the job data
-                        for i, job in enumerate(detailed_jobs):
-                            if result and i < len(result.inserted_ids):
-                                job["_id"] = str(result.inserted_ids[i])
-                        
-                        return detailed_jobs
-                
-                # If we got here with no jobs, log a warning
-                logger.warning(f"No jobs found for '{keywords}' in {location}")
-                await self.update_task(task_id, "completed", count=0)
-                return []
+                async with driver_pool.acquire() as entry:
+                    detailed_jobs = await self._search_with_driver(entry, keywords, location, limit, task_id, include_company_data)
                 
+            except DriverUnavailable as e:
+                await update_task(task_id, "failed", error=str(e))
+                return None
             except Exception as e:
                 logger.error(f"Error searching jobs: {str(e)}")
                 logger.error(traceback.format_exc())
                 
-                # Mark current proxy as failed
-                if self.current_proxy:
-                    self.proxy_handler.mark_proxy_as_failed(self.current_proxy)
-                    
+                # The pool discards the failed driver and marks its proxy as failed
                 # Retry with new proxy
                 retries += 1
                 if retries < max_retries:
@@ -280,111 +254,122 @@ class JobScraper:
                     await asyncio.sleep(2)  # Short delay before retry
                 else:
                     logger.error(f"Max retries reached for job search")
-                    await self.update_task(task_id, "failed", error=f"Failed after {max_retries} attempts")
+                    await update_task(task_id, "failed", error=f"Failed after {max_retries} attempts")
+                continue
+            
+            # Saved once the driver is back in the pool; a database error is
+            # no reason to scrape the search again
+            try:
+                return await self._save_jobs(detailed_jobs, keywords, location, task_id)
+            except Exception as e:
+                logger.error(f"Error saving jobs: {str(e)}")
+                await update_task(task_id, "failed", error=str(e))
+                return None
+                    
+        return None
+    
+    async def _scrape_with_driver(self, entry, url, task_id, include_company_data):
+        """Run one job scrape attempt on a pooled driver, returning the formatted job or None"""
+        loop = asyncio.get_running_loop()
+        
+        # Reuse the scrapers already built around this driver
+        job_scraper, company_scraper = self._scrapers_for(entry, include_company_data)
+        
+        # Use CustomJobScraper to get job details
+        job_data = await loop.run_in_executor(
+            SCRAPE_POOL,
+            partial(job_scraper.get_job_details, {"linkedin_url": url})
+        )
+        
+        if job_data:
+            # Add company data if requested
+            if include_company_data:
+                # Generate company URL if it's missing
+                if "company" in job_data and not job_data.get("company_linkedin_url"):
+                    company_name = job_data["company"]
+                    company_url = await loop.run_in_executor(
+                        SCRAPE_POOL,
+                        partial(company_scraper.url_extractor.generate_url_from_name, company_name)
+                    )
                     
+                    if company_url:
+                        job_data["company_linkedin_url"] = company_url
+                        logger.info(f"Generated company URL from name: {company_url}")
+                
+                # Get company details
+                if job_data.get("company_linkedin_url"):
+                    job_data = await loop.run_in_executor(
+                        SCRAPE_POOL,
+                        partial(company_scraper.scrape_company_for_job, job_data)
+                    )
+            
+            # Format job data on a scrape thread; parsing descriptions is CPU work
+            formatted_job = await loop.run_in_executor(
+                SCRAPE_POOL,
+                partial(self.job_formatter.format_job_data, job_data)
+            )
+            
+            # Lookup keys for id_helpers
+            formatted_job["job_title_lower"] = normalize_name(formatted_job.get("job_title"))
+            formatted_job["company_lower"] = normalize_name(formatted_job.get("company"))
+            
+            # Add metadata
+            formatted_job["metadata"] = {
+                "scraped_at": datetime.utcnow(),
+                "url": url,
+                "task_id": task_id
+            }
+            return formatted_job
         return None
     
+    async def _save_job(self, formatted_job, url, task_id):
+        """Save one scraped job to file and MongoDB and complete its task"""
+        if not formatted_job:
+            logger.warning(f"No data returned for job {url}")
+            await update_task(task_id, "completed", count=0)
+            return None
+        
+        # Save to file if requested
+        if self.save_to_file:
+            filename = f"job_{_slug(formatted_job.get('job_title'))}_{_slug(formatted_job.get('company'))}"
+            await asyncio.get_running_loop().run_in_executor(
+                SCRAPE_POOL,
+                partial(self.job_formatter.save_to_json, [formatted_job], filename)
+            )
+        
+        # Save to MongoDB, batched with inserts from concurrent scrapes
+        job_id = formatted_job["_id"] = ObjectId()
+        await job_writer.insert(formatted_job)
+        
+        # Update task status
+        await update_task(task_id, "completed", result_id=job_id)
+        
+        # Add MongoDB ID to the job data
+        formatted_job["_id"] = str(job_id)
+        return formatted_job
+    
     async def scrape_job(self, url, task_id=None, include_company_data=True):
         """Scrape a specific job with retry logic and proxy rotation"""
         max_retries = 3
         retries = 0
         
         # Update task to in_progress immediately
-        await self.update_task(task_id, "in_progress", error=None)
+        await update_task(task_id, "in_progress", error=None)
         
         while retries < max_retries:
             try:
-                # Setup driver if needed
-                if not self.driver:
-                    if not await self.setup_driver():
-                        await self.update_task(task_id, "failed", error="Failed to initialize WebDriver")
-                        return None
-                    
-                # Authenticate with LinkedIn
-                if not await self.authenticate():
-                    await self.update_task(task_id, "failed", error="Authentication failed")
-                    return None
-                    
-                # Run the scraping
                 logger.info(f"Scraping job: {url}, attempt {retries+1}/{max_retries}")
-                loop = asyncio.get_event_loop()
-                
-                # Initialize scrapers
-                job_scraper = CustomJobScraper(self.driver)
+                async with driver_pool.acquire() as entry:
+                    formatted_job = await self._scrape_with_driver(entry, url, task_id, include_company_data)
                 
-                # Use CustomJobScraper to get job details
-                job_data = await loop.run_in_executor(
-                    None,
-                    lambda: job_scraper.get_job_details({"linkedin_url": url})
-                )
-                
-                if job_data:
-                    # Add company data if requested
-                    if include_company_data:
-                        company_scraper = CompanyScraperIntegration(self.driver, self.data_formatter)
-                        
-                        # Generate company URL if it's missing
-                        if "company" in job_data and not job_data.get("company_linkedin_url"):
-                            company_name = job_data["company"]
-                            company_url = await loop.run_in_executor(
-                                None,
-                                lambda: company_scraper.url_extractor.generate_url_from_name(company_name)
-                            )
-                            
-                            if company_url:
-                                job_data["company_linkedin_url"] = company_url
-                                logger.info(f"Generated company URL from name: {company_url}")
-                        
-                        # Get company details
-                        if job_data.get("company_linkedin_url"):
-                            job_data = await loop.run_in_executor(
-                                None,
-                                lambda: company_scraper.scrape_company_for_job(job_data)
-                            )
-                    
-                    # Format job data
-                    formatted_job = self.job_formatter.format_job_data(job_data)
-                    
-                    # Add metadata
-                    formatted_job["metadata"] = {
-                        "scraped_at": datetime.now(),
-                        "url": url,
-                        "task_id": task_id
-                    }
-                    
-                    # Save to file if requested
-                    if self.save_to_file:
-                        job_title = formatted_job.get("job_title", "").replace(" ", "_").lower()
-                        company = formatted_job.get("company", "").replace(" ", "_").lower()
-                        filename = f"job_{job_title}_{company}"
-                        await loop.run_in_executor(
-                            None,
-                            lambda: self.job_formatter.save_to_json([formatted_job], filename)
-                        )
-                    
-                    # Save to MongoDB
-                    collection = get_jobs_collection()
-                    result = await collection.insert_one(formatted_job)
-                    
-                    # Update task status
-                    await self.update_task(task_id, "completed", result_id=result.inserted_id)
-                    
-                    # Add MongoDB ID to the job data
-                    formatted_job["_id"] = str(result.inserted_id)
-                    return formatted_job
-                    
-                logger.warning(f"No data returned for job {url}")
-                await self.update_task(task_id, "completed", count=0)
+            except DriverUnavailable as e:
+                await update_task(task_id, "failed", error=str(e))
                 return None
-                
             except Exception as e:
                 logger.error(f"Error scraping job {url}: {str(e)}")
                 logger.error(traceback.format_exc())
                 
-                # Mark current proxy as failed  
-                if self.current_proxy:
-                    self.proxy_handler.mark_proxy_as_failed(self.current_proxy)
-                    
+                # The pool discards the failed driver and marks its proxy as failed
                 # Retry with new proxy
                 retries += 1
                 if retries < max_retries:
@@ -392,14 +377,16 @@ class JobScraper:
                     await asyncio.sleep(2)  # Short delay before retry
                 else:
                     logger.error(f"Max retries reached for job {url}")
-                    await self.update_task(task_id, "failed", error=f"Failed after {max_retries} attempts")
+                    await update_task(task_id, "failed", error=f"Failed after {max_retries} attempts")
+                continue
+            
+            # Saved once the driver is back in the pool; a database error is
+            # no reason to scrape the job again
+            try:
+                return await self._save_job(formatted_job, url, task_id)
+            except Exception as e:
+                logger.error(f"Error saving job {url}: {str(e)}")
+                await update_task(task_id, "failed", error=str(e))
+                return None
                     
         return None
-        
-    def __del__(self):
-        """Clean up resources"""
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
\ No newline at end of file
@@ -1,26 +1,35 @@
 from fastapi import HTTPException
-from bson import ObjectId, errors
+from bson import ObjectId
+
+def normalize_name(value):
+    """Lookup key stored alongside names (name_lower, company_lower, ...)"""
+    return (value or "").strip().lower()
+
+def company_name(company: dict):
+    """Company name, from the top level or the scraper's flat raw_data"""
+    return company.get("name") or company.get("raw_data", {}).get("name", "")
 
 def validate_object_id(id_str: str):
     """Validate and convert string to ObjectId"""
-    try:
-        return ObjectId(id_str)
-    except (errors.InvalidId, TypeError):
+    # Checked up front so malformed IDs are rejected without raising InvalidId
+    if not isinstance(id_str, str) or not ObjectId.is_valid(id_str):
         raise HTTPException(status_code=400, detail="Invalid ID format")
+    return ObjectId(id_str)
 
 async def find_company_id_by_name(collection, name: str):
-    """Helper to find company ID by name"""
-    company = await collection.find_one({"name": {"$regex": f"^{name}$", "$options": "i"}})
+    """Helper to find company ID by name (case-insensitive)"""
+    # Exact match on the stored lowercase name instead of an anchored regex
+    company = await collection.find_one({"name_lower": normalize_name(name)}, projection={"_id": 1})
     if not company:
         return None
     return str(company["_id"])
 
 async def find_job_id_by_title_and_company(collection, title: str, company: str):
-    """Helper to find job ID by title and company"""
+    """Helper to find job ID by title and company (case-insensitive)"""
     job = await collection.find_one({
-        "job_title": {"$regex": f"^{title}$", "$options": "i"},
-        "company": {"$regex": f"^{company}$", "$options": "i"}
-    })
+        "job_title_lower": normalize_name(title),
+        "company_lower": normalize_name(company)
+    }, projection={"_id": 1})
     if not job:
         return None
     return str(job["_id"])
\ No newline at end of file
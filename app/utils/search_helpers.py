@@ -0,0 +1,35 @@
+import re
+from functools import lru_cache
+from bson import Regex
+
+@lru_cache(maxsize=1024)
+def contains_filter(value: str):
+    """Case-insensitive literal match; '*' in the input acts as a wildcard"""
+    pattern = ".*".join(re.escape(part) for part in value.split("*"))
+    return Regex(pattern, "i")
+
+def build_search_query(q, field_filters: dict):
+    """Build a search query: full-text search for q, substring matches for field filters
+
+    Field filters stay regex matches rather than $text terms; the text index
+    only matches whole stemmed words, so partial input like "Goo" would no
+    longer find "Google" and stop words alone would match nothing.
+    """
+    query = {}
+    
+    for field, value in field_filters.items():
+        if value:
+            query[field] = contains_filter(value)
+    
+    if q:
+        # Full text search across all fields
+        query["$text"] = {"$search": q}
+    
+    return query
+
+async def find_matches(collection, query, skip, limit):
+    """Run a search query, ranking text matches by relevance"""
+    cursor = collection.find(query)
+    if "$text" in query:
+        cursor = cursor.sort([("score", {"$meta": "textScore"})])
+    return await cursor.skip(skip).limit(limit).to_list(length=limit)
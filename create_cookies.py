@@ -1,14 +1,15 @@
 import os
 import time
 import logging
-import shutil
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from utils.cookie_auth import LinkedInCookieAuth
 from utils.browser_setup import BrowserSetup
+from utils.proxy_handler import BLOCKED_URLS
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,11 +17,69 @@ load_dotenv()
 LINKEDIN_USER = os.getenv('LINKEDIN_USER')
 LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD')
 
+# Where the API looks for saved session cookies
+COOKIE_PATH = 'cookies/linkedin_cookies.pkl'
+
+# Login form selectors across LinkedIn's page variants, tried as one CSS selector list
+USERNAME_SELECTORS = ["#username", "input[name='session_key']", "#email-or-phone", "input[type='text']"]
+PASSWORD_SELECTORS = ["#password", "input[name='session_password']", "input[type='password']"]
+SIGNIN_SELECTORS = ["button[type='submit']", "button.btn__primary--large", "button[aria-label='Sign in']"]
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('cookie_creator')
 
-def main():
+def _on_feed(url):
+    """Whether a URL is the logged-in feed; /login?session_redirect=...feed... is not"""
+    return urlparse(url).path.startswith('/feed')
+
+class CookieMinter:
+    """Keeps a browser resident between runs and logs in again only when the cookies go stale"""
+    
+    def __init__(self, headless=True):
+        self.headless = headless
+        self.driver = None
+    
+    def ensure_fresh(self, max_age_hours=12):
+        """Mint new cookies unless the saved ones are younger than max_age_hours"""
+        try:
+            age = time.time() - os.path.getmtime(COOKIE_PATH)
+            if age < max_age_hours * 3600:
+                logger.info(f"Saved cookies are {age / 3600:.1f}h old, skipping login")
+                return True
+        except OSError:
+            pass  # No cookie file yet
+        return self.mint()
+    
+    def mint(self):
+        """Log in (or reuse the resident browser's session) and save the cookies"""
+        if self.driver is None:
+            self.driver = _start_browser(self.headless)
+            if not self.driver:
+                return False
+        else:
+            # The resident browser may still be logged in; then just re-save its session
+            self.driver.get('https://www.linkedin.com/feed/')
+            if _on_feed(self.driver.current_url):
+                logger.info("Resident browser is still logged in")
+                return _save_session(self.driver)
+        return _log_in_and_save_cookies(self.driver)
+    
+    def close(self):
+        """Quit the resident browser"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+
+def main(headless=True):
+    minter = CookieMinter(headless=headless)
+    try:
+        return minter.mint()
+    finally:
+        minter.close()
+
+def _start_browser(headless):
+    """Start the browser cookies are minted in, or return None"""
     # Create required directories first
     try:
         os.makedirs('cookies', exist_ok=True)
@@ -29,27 +88,21 @@ def main():
     except Exception as e:
         logger.warning(f"Could not create directories: {str(e)}")
     
-    # Create browser with anti-detection features
+    # Create browser with anti-detection features; images are never needed to log in
     browser_setup = BrowserSetup()
-    chrome_options = Options()
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument('--disable-extensions')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--no-sandbox')
-    
-    logger.info("Creating browser...")
-    driver = browser_setup.create_driver(chrome_options, headless=False)
+    logger.info(f"Creating {'headless' if headless else 'visible'} browser...")
+    driver = browser_setup.create_driver(headless=headless, block_images=True)
     
     if not driver:
         logger.error("Failed to create browser")
-        return False
+        return None
     
-    # Initialize auth helper
-    auth_helper = LinkedInCookieAuth(driver)
+    # Skip downloading the heavy assets the login form doesn't need
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except Exception as e:
+        logger.warning(f"Could not block page assets: {str(e)}")
     
     # Modify user agent for less detection
     try:
@@ -66,116 +119,84 @@ def main():
         logger.warning(f"Could not apply stealth script: {str(e)}")
         # Continue anyway - this is not critical
     
+    return driver
+
+def _save_session(driver):
+    """Save the logged-in browser's cookies where the API loads them from"""
+    # Create cookies directory
+    os.makedirs('cookies', exist_ok=True)
+    
+    auth_helper = LinkedInCookieAuth(driver)
+    auth_helper.cookie_file = COOKIE_PATH
+    auth_helper.save_cookies(driver)
+    logger.info(f"Cookies saved to {COOKIE_PATH}")
+    return True
+
+def _log_in_and_save_cookies(driver):
+    """Log in through LinkedIn's login page and save the session cookies"""
     # Try to authenticate
     logger.info("Attempting login...")
     
     # Go directly to login page
     driver.get('https://www.linkedin.com/login')
-    time.sleep(3)
     
-    # Check if we need to handle a different page variant
-    page_source = driver.page_source.lower()
-    if "sign in" in page_source:
+    # Continue as soon as the login form renders rather than after a fixed delay
+    try:
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(USERNAME_SELECTORS)))
+        )
+    except TimeoutException:
+        logger.warning("Login form did not appear")
+    
+    # Check if we need to handle a different page variant; probing for the
+    # password input avoids shipping the whole page source over the driver
+    if driver.find_elements(By.CSS_SELECTOR, ", ".join(PASSWORD_SELECTORS)):
         logger.info("Standard login page detected")
         
-        # Find username field using multiple methods
+        # Find username field; the selector list matches whichever login variant is served
         try:
-            # Try different selectors with explicit wait
-            username_field = None
-            for selector in ["#username", "input[name='session_key']", "#email-or-phone", "input[type='text']"]:
-                try:
-                    username_field = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if username_field:
-                        logger.info(f"Found username field with selector: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not username_field:
-                raise Exception("Username field not found")
+            username_field = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(USERNAME_SELECTORS)))
+            )
+            logger.info("Found username field")
                 
             # Find password field
-            password_field = None
-            for selector in ["#password", "input[name='session_password']", "input[type='password']"]:
-                try:
-                    password_field = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if password_field:
-                        logger.info(f"Found password field with selector: {selector}")
-                        break
-                except:
-                    continue
-                    
-            if not password_field:
-                raise Exception("Password field not found")
+            password_field = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(PASSWORD_SELECTORS)))
+            )
+            logger.info("Found password field")
             
-            # Enter credentials with human-like delays
+            # Enter credentials, one WebDriver command per field
             username_field.clear()
-            for char in LINKEDIN_USER:
-                username_field.send_keys(char)
-                time.sleep(0.1)
-                
-            time.sleep(1)
+            username_field.send_keys(LINKEDIN_USER)
             
             password_field.clear()
-            for char in LINKEDIN_PASSWORD:
-                password_field.send_keys(char)
-                time.sleep(0.1)
-                
-            time.sleep(1)
+            password_field.send_keys(LINKEDIN_PASSWORD)
             
             # Find sign in button
-            signin_button = None
-            for selector in ["button[type='submit']", "button.btn__primary--large", 
-                           "button[aria-label='Sign in']", "button:contains('Sign in')"]:
-                try:
-                    signin_button = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    if signin_button:
-                        logger.info(f"Found signin button with selector: {selector}")
-                        break
-                except:
-                    continue
-                    
-            if not signin_button:
+            try:
+                signin_button = WebDriverWait(driver, 10).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, ", ".join(SIGNIN_SELECTORS)))
+                )
+                logger.info("Found signin button")
+            except TimeoutException:
                 signin_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Sign in')]")
-            
-            if not signin_button:
-                raise Exception("Sign in button not found")
                 
             # Click sign in
             signin_button.click()
             logger.info("Clicked sign in button")
-            time.sleep(5)
             
-            # Wait for successful login
-            max_wait = 30
-            start_time = time.time()
-            while time.time() - start_time < max_wait:
-                if "feed" in driver.current_url:
-                    logger.info("Successfully logged in!")
-                    break
-                time.sleep(1)
+            # Wait for successful login; returns as soon as the feed loads
+            try:
+                WebDriverWait(driver, 30, poll_frequency=0.25).until(lambda d: _on_feed(d.current_url))
+                logged_in = True
+                logger.info("Successfully logged in!")
+            except TimeoutException:
+                logged_in = False
             
             # Check if login was successful
-            if "feed" in driver.current_url:
-                # Create cookies directory
-                os.makedirs('cookies', exist_ok=True)
-                
-                # Save cookies
-                auth_helper.cookie_file = 'cookies/linkedin_cookies.pkl'
-                auth_helper.save_cookies(driver)
-                logger.info("Cookies saved successfully")
-                
-                # Copy cookies to standard location for API compatibility
-                standard_path = 'cookies/linkedin_cookies.pkl'
-                if auth_helper.cookie_file != standard_path:
-                    shutil.copy(auth_helper.cookie_file, standard_path)
-                    logger.info(f"Copied cookies to {standard_path}")
+            if logged_in:
+                _save_session(driver)
                 
                 # Take screenshot of successful login
                 driver.save_screenshot("login_success.png")
@@ -197,4 +218,8 @@ def main():
         return False
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # LinkedIn sometimes serves headless browsers a different page, so fall
+    # back to a visible one; its cookies are saved just the same
+    if not main():
+        logger.info("Headless login failed, retrying with a visible browser")
+        main(headless=False)
\ No newline at end of file
@@ -1,134 +1,217 @@
 import re
-import json
+import orjson
 import os
 import logging
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import count
+from operator import attrgetter
+from types import SimpleNamespace
+
+# One log file handler for every formatter instance, set up at import
+logger = logging.getLogger("linkedin_formatter")
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    _handler = logging.FileHandler("formatter.log", delay=True)  # opened on the first record
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(_handler)
+
+# Compiled once for clean_text, which runs on every scraped string field.
+# Matches a run of HTML tags and whitespace; group 1 is set when the run
+# holds any whitespace outside a tag.
+_TAGS_AND_SPACES_RE = re.compile(r'(?:(\s)|<[^>]+>)+')
+
+def _collapse(match):
+    return ' ' if match.group(1) else ''
+
+def _clean_text(text):
+    """clean_text without the method lookup, for the formatters' per-field calls"""
+    # Missing fields are the common case; skip the regex for them
+    if not text:
+        return ""
+    
+    # Remove HTML tags and replace multiple spaces/newlines with a single
+    # space in one pass; equivalent to stripping tags first, then collapsing
+    return _TAGS_AND_SPACES_RE.sub(_collapse, str(text)).strip()
+
+def _field_reader(*names):
+    """Read several attributes in one attrgetter call; missing ones default to ''"""
+    getter = attrgetter(*names)
+    def read(obj):
+        try:
+            return getter(obj)
+        except AttributeError:
+            return tuple(getattr(obj, name, '') for name in names)
+    return read
+
+def _split_location(location):
+    """Split 'City, State, Country' in one pass; missing parts come back as ''"""
+    city, state, country = (location.strip().split(', ') + ['', '', ''])[:3]
+    return city, state, country
+
+# Scraped company fields, read the same way from Company objects and dicts
+_COMPANY_FIELDS = (
+    'name', 'industry', 'about_us', 'linkedin_url', 'website', 'phone', 'logo',
+    'specialties', 'headquarters', 'employees', 'showcase_pages', 'affiliated_companies',
+    'founded', 'company_type', 'company_size', 'headcount'
+)
+_EMPLOYEE_FIELDS = ('name', 'designation', 'linkedin_url', 'photo_url')
+
+_PERSON_FIELDS = ('name', 'headline', 'location', 'about', 'linkedin_url', 'experiences', 'educations', 'skills')
+
+_read_company = _field_reader(*_COMPANY_FIELDS)
+_read_person = _field_reader(*_PERSON_FIELDS)
+_read_experience = _field_reader('position_title', 'institution_name', 'location', 'from_date', 'to_date', 'description')
+_read_education = _field_reader('institution_name', 'degree', 'field_of_study', 'from_date', 'to_date')
+_read_employee = _field_reader(*_EMPLOYEE_FIELDS)
+_read_summary = _field_reader('linkedin_url', 'name', 'followers')
+
+def _summary_fields(summary):
+    """A showcase page or affiliated company as a plain dict, from a scraped dict or a CompanySummary"""
+    if isinstance(summary, dict):
+        return summary
+    return dict(zip(('linkedin_url', 'name', 'followers'), _read_summary(summary)))
+
+def _read_employee_fields(employee):
+    """Employee fields as a tuple, from a scraped dict or an Employee object"""
+    if isinstance(employee, dict):
+        return tuple(employee.get(key, '') for key in _EMPLOYEE_FIELDS)
+    return _read_employee(employee)
+
+# Suffix that keeps files saved within the same second apart
+_save_counter = count()
+
+# Batches smaller than this are formatted in-process; worker start-up costs more
+PARALLEL_MIN_BATCH = 64
+
+# Fields format_many copies out of scraped objects for each kind of record
+_SNAPSHOT_FIELDS = {
+    "company": (_COMPANY_FIELDS, _read_company),
+    "profile": (_PERSON_FIELDS, _read_person)
+}
+
+# Formatter used by format_many, created once per (worker) process
+_batch_formatter = None
+
+def _snapshot(kind, record):
+    """Picklable copy of the fields a formatter reads; scraped objects hold their WebDriver"""
+    if isinstance(record, dict):
+        return record
+    names, read = _SNAPSHOT_FIELDS[kind]
+    return SimpleNamespace(**dict(zip(names, read(record))))
+
+def _format_record(kind, record):
+    global _batch_formatter
+    if _batch_formatter is None:
+        _batch_formatter = LinkedInFormatter()
+    if kind == "profile":
+        return _batch_formatter.format_profile_data(record)
+    if isinstance(record, dict):
+        return _batch_formatter.format_company_data_from_dict(record)
+    return _batch_formatter.format_company_data(record)
 
 class LinkedInFormatter:
     def __init__(self):
-        self.logger = logging.getLogger("linkedin_formatter")
-        self.logger.setLevel(logging.INFO)
-        if not self.logger.handlers:
-            handler = logging.FileHandler("formatter.log")
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        self.logger = logger
     
     def clean_text(self, text):
         """Clean and format text by removing extra spaces and HTML tags"""
-        if not text:
-            return ""
-            
-        # Convert to string if not already
-        text = str(text)
+        return _clean_text(text)
+    
+    def _build_company_data(self, get, max_leaders=None):
+        """Build the company.json structure; get(field) returns a scraped field or ''"""
+        about_text = _clean_text(get('about_us'))
+        headcount = get('headcount')  # kept as read, so a real 0 isn't lost
+        company_info = {
+            "portal": "LinkedIn",
+            "name": _clean_text(get('name')),
+            "offices": [],
+            "industry": _clean_text(get('industry')),
+            "description": {
+                "text": about_text,
+                "html": about_text,
+                "vision": ""
+            },
+            "url": get('linkedin_url'),
+            "website": _clean_text(get('website')),
+            "phone": _clean_text(get('phone')),
+            "logo": get('logo'),
+            "rating": None,
+            "reviewsCount": None,
+            "openings": None,
+            "commitments": {
+                "_ids": [],
+                "names": []
+            },
+            "leadership": [],
+            "companyInsight": {
+                "financialInsight": {
+                    "currentStage": "",
+                    "keyInvestors": ""
+                },
+                "gallery": [],
+                "benefits": []
+            },
+            "showcasePages": [_summary_fields(page) for page in get('showcase_pages') or []],
+            "affiliatedCompanies": [_summary_fields(company) for company in get('affiliated_companies') or []],
+            "foundedYear": _clean_text(get('founded')),
+            "companyType": _clean_text(get('company_type')),
+            "companySize": _clean_text(get('company_size')),
+            "headcount": None if headcount == '' else headcount,
+            "isFeatured": False
+        }
+        
+        # Add headquarters location
+        headquarters = get('headquarters')
+        if headquarters:
+            city, state, country = _split_location(headquarters)
+            company_info["offices"].append({
+                "location": {
+                    "area": "",
+                    "city": city,
+                    "state": state,
+                    "country": country
+                }
+            })
         
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        # Add company specialties as commitments
+        specialties = get('specialties')
+        if specialties:
+            company_info["commitments"]["names"] = [s.strip() for s in specialties.split(',') if s.strip()]
         
-        # Replace multiple spaces/newlines with single space
-        text = re.sub(r'\s+', ' ', text)
+        # Add employees as leadership; dicts and Employee objects are read into
+        # the same field tuples first so building the entries is one path
+        employees = [_read_employee_fields(employee) for employee in (get('employees') or [])[:max_leaders]]
+        company_info["leadership"] = [
+            {
+                "url": url,
+                "logo": "",
+                "name": _clean_text(name),
+                "position": _clean_text(position),
+                "photo_url": photo_url
+            }
+            for name, position, url, photo_url in employees
+        ]
         
-        return text.strip()
+        return {
+            "JobDetails": {
+                "companyInfo": company_info
+            },
+            "CompanyData": {
+                "rating": [],
+                "reviews": []
+            }
+        }
     
     def format_company_data(self, company):
         """Format company data to match the desired schema"""
         try:
-            # Create the base structure following company.json format
-            company_data = {
-                "JobDetails": {
-                    "companyInfo": {
-                        "portal": "LinkedIn",
-                        "name": self.clean_text(getattr(company, 'name', '')),
-                        "offices": [],
-                        "industry": self.clean_text(getattr(company, 'industry', '')),
-                        "description": {
-                            "text": self.clean_text(getattr(company, 'about_us', '')),
-                            "html": self.clean_text(getattr(company, 'about_us', '')),
-                            "vision": ""
-                        },
-                        "url": getattr(company, 'linkedin_url', ''),
-                        "website": self.clean_text(getattr(company, 'website', '')),
-                        "logo": "",
-                        "rating": None,
-                        "reviewsCount": None,
-                        "openings": None,
-                        "commitments": {
-                            "_ids": [],
-                            "names": []
-                        },
-                        "leadership": [],
-                        "companyInsight": {
-                            "financialInsight": {
-                                "currentStage": "",
-                                "keyInvestors": ""
-                            },
-                            "gallery": [],
-                            "benefits": []
-                        },
-                        "isFeatured": False
-                    }
-                },
-                "CompanyData": {
-                    "rating": [],
-                    "reviews": []
-                }
-            }
-            
-            # Add company specialties as commitments
-            if hasattr(company, 'specialties') and company.specialties:
-                specialties = [s.strip() for s in company.specialties.split(',') if s.strip()]
-                company_data["JobDetails"]["companyInfo"]["commitments"]["names"] = specialties
-            
-            # Add headquarters location
-            if hasattr(company, 'headquarters') and company.headquarters:
-                location = company.headquarters.strip()
-                location_parts = location.split(', ')
-                
-                office = {
-                    "location": {
-                        "area": "",
-                        "city": location_parts[0] if len(location_parts) > 0 else "",
-                        "state": location_parts[1] if len(location_parts) > 1 else "",
-                        "country": location_parts[-1] if len(location_parts) > 0 else ""
-                    }
-                }
-                company_data["JobDetails"]["companyInfo"]["offices"].append(office)
-            
-            # Add employees as leadership
-            if hasattr(company, 'employees') and company.employees:
-                for i, employee in enumerate(company.employees):
-                    if i >= 5:  # Limit to 5 leaders
-                        break
-                        
-                    if isinstance(employee, dict):
-                        name = employee.get('name', '')
-                        position = employee.get('designation', '')
-                        url = employee.get('linkedin_url', '')
-                    else:
-                        name = getattr(employee, 'name', '')
-                        position = getattr(employee, 'designation', '')
-                        url = getattr(employee, 'linkedin_url', '')
-                        
-                    leadership_entry = {
-                        "url": url,
-                        "logo": "",
-                        "name": self.clean_text(name),
-                        "position": self.clean_text(position)
-                    }
-                    company_data["JobDetails"]["companyInfo"]["leadership"].append(leadership_entry)
-            
-            # Add company size if available
-            if hasattr(company, 'company_size') and company.company_size:
-                company_data["JobDetails"]["companyInfo"]["companySize"] = self.clean_text(company.company_size)
-            
-            # Add founded year if available
-            if hasattr(company, 'founded') and company.founded:
-                company_data["JobDetails"]["companyInfo"]["foundedYear"] = self.clean_text(company.founded)
-            
-            return company_data
+            fields = dict(zip(_COMPANY_FIELDS, _read_company(company)))
+            return self._build_company_data(fields.get, max_leaders=5)  # Limit to 5 leaders
             
         except Exception as e:
-            self.logger.error(f"Error formatting company data: {str(e)}")
+            self.logger.error("Error formatting company data: %s", e)
             # Return basic data structure with error
             return {
                 "JobDetails": {
@@ -146,130 +229,50 @@ class LinkedInFormatter:
             # Already in the correct format
             return company_data
         
-        # Create the base structure following your schema
-        formatted_data = {
-            "JobDetails": {
-                "companyInfo": {
-                    "portal": "LinkedIn",
-                    "name": self.clean_text(company_data.get('name', '')),
-                    "offices": [],
-                    "industry": self.clean_text(company_data.get('industry', '')),
-                    "description": {
-                        "text": self.clean_text(company_data.get('about_us', '')),
-                        "html": self.clean_text(company_data.get('about_us', '')),
-                        "vision": ""
-                    },
-                    "url": company_data.get('linkedin_url', ''),
-                    "website": self.clean_text(company_data.get('website', '')),
-                    "phone": self.clean_text(company_data.get('phone', '')),
-                    "logo": company_data.get('logo', ''),
-                    "rating": None,
-                    "reviewsCount": None,
-                    "openings": None,
-                    "commitments": {
-                        "_ids": [],
-                        "names": []
-                    },
-                    "leadership": company_data.get('employees', []),
-                    "companyInsight": {
-                        "financialInsight": {}
-                    },
-                    "showcasePages": company_data.get('showcase_pages', []),
-                    "affiliatedCompanies": company_data.get('affiliated_companies', []),
-                    "foundedYear": self.clean_text(company_data.get('founded', '')),
-                    "companyType": self.clean_text(company_data.get('company_type', '')),
-                    "companySize": self.clean_text(company_data.get('company_size', '')),
-                    "headcount": company_data.get('headcount'),
-                    "isFeatured": False
-                }
-            },
-            "CompanyData": {
-                "rating": [],
-                "reviews": []
-            }
-        }
-        
-        # Add headquarters if available
-        if company_data.get('headquarters'):
-            location_parts = company_data['headquarters'].split(", ")
-            formatted_data["JobDetails"]["companyInfo"]["offices"].append({
-                "location": {
-                    "area": "",
-                    "city": location_parts[0] if len(location_parts) > 0 else "",
-                    "state": location_parts[1] if len(location_parts) > 1 else "",
-                    "country": location_parts[2] if len(location_parts) > 2 else 
-                               (location_parts[1] if len(location_parts) > 1 else "")
-                }
-            })
-        
-        # Add specialties as commitments
-        if company_data.get('specialties'):
-            specialties = [s.strip() for s in company_data['specialties'].split(',') if s.strip()]
-            formatted_data["JobDetails"]["companyInfo"]["commitments"]["names"] = specialties
-        
-        # Add leadership profiles
-        if company_data.get('employees'):
-            formatted_data["JobDetails"]["companyInfo"]["leadership"] = []
-            for employee in company_data['employees']:
-                if isinstance(employee, dict):
-                    leadership_entry = {
-                        "name": self.clean_text(employee.get('name', '')),
-                        "position": self.clean_text(employee.get('designation', '')),
-                        "url": employee.get('linkedin_url', ''),
-                        "photo_url": employee.get('photo_url', '')
-                    }
-                    formatted_data["JobDetails"]["companyInfo"]["leadership"].append(leadership_entry)
-        
-        return formatted_data
+        return self._build_company_data(lambda field: company_data.get(field, ''))
 
     def format_profile_data(self, person):
         """Format profile data to match the desired schema"""
         try:
+            name, headline, location, about, linkedin_url, experiences, educations, skills = _read_person(person)
+            
             # Basic profile information
             profile_data = {
-                "name": self.clean_text(getattr(person, 'name', '')),
-                "headline": self.clean_text(getattr(person, 'headline', '')),
-                "location": self.clean_text(getattr(person, 'location', '')),
-                "about": self.clean_text(getattr(person, 'about', '')),
-                "experiences": [],
-                "education": [],
-                "skills": [],
-                "linkedinUrl": getattr(person, 'linkedin_url', '')
-            }
-            
-            # Add experiences
-            if hasattr(person, 'experiences') and person.experiences:
-                for exp in person.experiences:
-                    experience = {
-                        "title": self.clean_text(getattr(exp, 'position_title', '')),
-                        "company": self.clean_text(getattr(exp, 'institution_name', '')),
-                        "location": self.clean_text(getattr(exp, 'location', '')),
-                        "fromDate": self.clean_text(getattr(exp, 'from_date', '')),
-                        "toDate": self.clean_text(getattr(exp, 'to_date', '')),
-                        "description": self.clean_text(getattr(exp, 'description', ''))
+                "name": _clean_text(name),
+                "headline": _clean_text(headline),
+                "location": _clean_text(location),
+                "about": _clean_text(about),
+                "experiences": [
+                    {
+                        "title": title,
+                        "company": company,
+                        "location": exp_location,
+                        "fromDate": from_date,
+                        "toDate": to_date,
+                        "description": description
                     }
-                    profile_data["experiences"].append(experience)
-            
-            # Add education
-            if hasattr(person, 'educations') and person.educations:
-                for edu in person.educations:
-                    education = {
-                        "school": self.clean_text(getattr(edu, 'institution_name', '')),
-                        "degree": self.clean_text(getattr(edu, 'degree', '')),
-                        "field": self.clean_text(getattr(edu, 'field_of_study', '')),
-                        "fromDate": self.clean_text(getattr(edu, 'from_date', '')),
-                        "toDate": self.clean_text(getattr(edu, 'to_date', ''))
+                    for title, company, exp_location, from_date, to_date, description
+                    in (map(_clean_text, _read_experience(exp)) for exp in experiences or [])
+                ],
+                "education": [
+                    {
+                        "school": school,
+                        "degree": degree,
+                        "field": field,
+                        "fromDate": from_date,
+                        "toDate": to_date
                     }
-                    profile_data["education"].append(education)
-            
-            # Add skills
-            if hasattr(person, 'skills') and person.skills:
-                profile_data["skills"] = [self.clean_text(skill) for skill in person.skills]
+                    for school, degree, field, from_date, to_date
+                    in (map(_clean_text, _read_education(edu)) for edu in educations or [])
+                ],
+                "skills": [_clean_text(skill) for skill in skills or []],
+                "linkedinUrl": linkedin_url
+            }
             
             return profile_data
             
         except Exception as e:
-            self.logger.error(f"Error formatting profile data: {str(e)}")
+            self.logger.error("Error formatting profile data: %s", e)
             # Return basic data with error
             return {
                 "name": getattr(person, 'name', 'Unknown'),
@@ -277,25 +280,70 @@ class LinkedInFormatter:
                 "linkedinUrl": getattr(person, 'linkedin_url', '')
             }
             
+    def format_many(self, records, kind="company", filename=None, max_workers=None):
+        """Format a batch of scraped companies or profiles, spread over worker processes
+        
+        Formatting is CPU-bound regex work, so large batches go to a process
+        pool. With a filename, the whole batch is saved to one JSON file.
+        """
+        snapshots = [_snapshot(kind, record) for record in records]
+        if len(snapshots) < PARALLEL_MIN_BATCH:
+            formatted = [_format_record(kind, record) for record in snapshots]
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                formatted = list(pool.map(
+                    partial(_format_record, kind),
+                    snapshots,
+                    chunksize=max(1, len(snapshots) // (workers * 4))
+                ))
+        
+        if filename:
+            self.save_to_json(formatted, filename)
+        return formatted
+    
+    def _output_path(self, filename, extension):
+        """Timestamped path for a new file in the output directory"""
+        # Create output directory if it doesn't exist
+        output_dir = 'scraped_data'
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        # Add timestamp to filename
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return os.path.join(output_dir, f"{filename}_{timestamp}_{next(_save_counter)}.{extension}")
+    
     def save_to_json(self, data, filename):
         """Save data to JSON file with timestamp"""
         try:
-            # Create output directory if it doesn't exist
-            output_dir = 'scraped_data'
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # Add timestamp to filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = os.path.join(output_dir, f"{filename}_{timestamp}.json")
+            filepath = self._output_path(filename, "json")
             
             # Write data to file with pretty formatting
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                
+            self.logger.info("Data saved to %s", filepath)
+            return filepath
+            
+        except Exception as e:
+            self.logger.error("Error saving JSON data: %s", e)
+            return None
+    
+    def save_batch(self, records, filename):
+        """Save many records to one JSON Lines file (one record per line) with timestamp"""
+        try:
+            filepath = self._output_path(filename, "jsonl")
+            
+            # One file and one write for the whole batch
+            with open(filepath, 'wb') as f:
+                f.write(b"".join(
+                    orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+                    for record in records
+                ))
                 
-            self.logger.info(f"Data saved to {filepath}")
+            self.logger.info("Saved %d records to %s", len(records), filepath)
             return filepath
             
         except Exception as e:
-            self.logger.error(f"Error saving JSON data: {str(e)}")
-            return None
\ No newline at end of file
+            self.logger.error("Error saving JSON Lines data: %s", e)
+            return None
@@ -1,7 +1,11 @@
 import os
-import json
+import orjson
 import logging
-from datetime import datetime
+import time
+from itertools import count
+
+# Suffix that keeps files saved within the same second apart
+_save_counter = count()
 
 class JobFormatter:
     def __init__(self, output_dir='scraped_data'):
@@ -64,12 +68,12 @@ class JobFormatter:
         """Save data to JSON file with timestamp"""
         try:
             # Add timestamp to filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = os.path.join(self.output_dir, f"{filename}_{timestamp}.json")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            filepath = os.path.join(self.output_dir, f"{filename}_{timestamp}_{next(_save_counter)}.json")
             
             # Save the data
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
             self.logger.info(f"Job data saved to {filepath}")
             return filepath
@@ -2,13 +2,17 @@ import os
 import time
 import random
 import logging
-import json
+import orjson
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from dotenv import load_dotenv
 
 # Import our custom modules
 from utils.proxy_handler import ProxyHandler
 from utils.cookie_auth import LinkedInCookieAuth
+from utils.company_cache import CompanyCache
 from dataformatter.data_formatter import LinkedInFormatter
 from linkedin_scraper.custom_company_scraper import CustomCompanyScraper
 from utils.logging_config import LoggingConfig
@@ -32,15 +36,58 @@ PROFILE_URLS = [
      "https://www.linkedin.com/in/jsu05/"
 ]
 
+# Indent saved company files; off by default since it slows serialization and bloats them
+PRETTY_JSON = os.getenv('PRETTY_JSON', '').lower() in ('1', 'true', 'yes')
+
+# How scrape_with_retry treats a failed attempt
+RATE_LIMITED, TRANSIENT, FATAL = "rate_limited", "transient", "fatal"
+
+# Text in errors (and LinkedIn's error pages) that means we are being throttled
+RATE_LIMIT_MARKERS = ("429", "too many requests", "rate limit")
+
+def _classify_failure(error):
+    """RATE_LIMITED, TRANSIENT or FATAL for an exception raised while scraping"""
+    message = str(error).lower()
+    if any(marker in message for marker in RATE_LIMIT_MARKERS):
+        return RATE_LIMITED
+    # Parsing bugs fail the same way on every attempt
+    if isinstance(error, (KeyError, TypeError, ValueError, AttributeError)):
+        return FATAL
+    return TRANSIENT
+
+# Browser sessions scraping at once, each on its own proxy; kept low so
+# LinkedIn sees a handful of users rather than a burst from one
+SCRAPE_WORKERS = 3
+
+def _scrape_one(sessions, scrape, url):
+    """Scrape url with the next free session, then give it back after a polite pause"""
+    worker = sessions.get()
+    worker.loaded_page = False
+    try:
+        return scrape(worker, url)
+    finally:
+        # Cache hits and unimplemented scrapes never reached LinkedIn, so only
+        # a real page load earns the pause; each session waits on its own, so
+        # the others keep working meanwhile
+        if worker.loaded_page:
+            delay = random.uniform(3, 8)
+            logger.info(f"Waiting {delay:.1f} seconds before next request on this session")
+            time.sleep(delay)
+        sessions.put(worker)
+
 class LinkedInScraper:
-    def __init__(self, proxy_file='utils/proxies.txt', headless=False):
-        self.proxy_handler = ProxyHandler(proxy_file=proxy_file)
+    def __init__(self, proxy_file='utils/proxies.txt', headless=False, proxy_handler=None):
+        # Sessions started for the same run share one handler, so they rotate
+        # through different proxies and see each other's failures
+        self.proxy_handler = proxy_handler or ProxyHandler(proxy_file=proxy_file)
         self.driver = None
         self.current_proxy = None
         self.headless = headless
-        self.company_cache = {}
+        self.company_cache = CompanyCache()  # Companies scraped by earlier runs
         self.formatter = LinkedInFormatter()  # Initialize formatter
         self.auth = None  # Will be initialized during setup_driver
+        self.company_scraper = None  # Bound to the current driver by setup_driver
+        self.loaded_page = False  # Whether the current scrape loaded a LinkedIn page
         self.setup_driver()
         
     def setup_driver(self):
@@ -63,6 +110,17 @@ class LinkedInScraper:
         if self.driver:
             # Initialize authentication helper
             self.auth = LinkedInCookieAuth(self.driver)
+            self.company_scraper = CustomCompanyScraper(self.driver)
+
+    def reauth_cookies(self):
+        """Log the current driver in with the saved cookies; no extra browser, no credentials"""
+        if not self.driver or not self.auth or not os.path.exists(self.auth.cookie_file):
+            return False
+        
+        if self.auth.load_cookies(self.driver) and self.auth.verify_login(self.driver):
+            logger.info("Successfully authenticated with saved cookies")
+            return True
+        return False
 
     def authenticate(self):
         """Improved authentication with better error handling"""
@@ -70,6 +128,11 @@ class LinkedInScraper:
             logger.error("Driver or auth not initialized")
             return False
         
+        # Cookies are the session, so they work on this driver as they are;
+        # the direct-connection driver below is only needed without them
+        if self.reauth_cookies():
+            return True
+        
         # First try with direct connection (no proxy) for authentication
         original_proxy = self.current_proxy
         original_driver = self.driver
@@ -143,43 +206,68 @@ class LinkedInScraper:
         logger.error("All authentication methods failed")
         return False
 
-    def scrape_with_retry(self, url, scrape_function, max_retries=3):
-        """Execute a scraping function with retry logic"""
-        retries = 0
-        while retries < max_retries:
+    def _rotate_proxy(self):
+        """Move to a fresh driver on the next proxy, marking the current one as failed"""
+        if self.current_proxy:
+            logger.info(f"Marking proxy {self.current_proxy} as failed")
+            self.proxy_handler.mark_proxy_as_failed(self.current_proxy)
+        
+        self.setup_driver()  # Get new driver with fresh proxy
+        
+        # Need to authenticate again with new driver; authenticate() tries the
+        # saved cookies first and logs in with credentials once they expire
+        if not self.authenticate():
+            logger.error("Authentication failed with new proxy")
+            return False
+        return True
+
+    def scrape_with_retry(self, url, scrape_function, max_retries=3, base_delay=1.0):
+        """Execute a scraping function with retry logic
+        
+        Rate limiting backs off exponentially on the same session and only
+        moves to a new proxy if it persists; other failures move right away.
+        """
+        rotate = False
+        for attempt in range(max_retries):
+            # Never scrape on the logged-out driver a failed rotation leaves
+            if rotate and not self._rotate_proxy():
+                logger.error(f"Skipping attempt {attempt+1}/{max_retries} for {url}: no authenticated session")
+                continue
+            rotate = False
+            
             try:
-                logger.info(f"Scraping {url}, attempt {retries+1}/{max_retries}")
+                logger.info(f"Scraping {url}, attempt {attempt+1}/{max_retries}")
                 result = scrape_function(url)
                 if result:
                     logger.info(f"Successfully scraped {url}")
                     return result
+                failure = TRANSIENT
             except Exception as e:
                 logger.error(f"Error scraping {url}: {str(e)}")
                 import traceback
                 logger.error(traceback.format_exc())
-                
-                # Mark current proxy as failed
-                if self.current_proxy:
-                    logger.info(f"Marking proxy {self.current_proxy} as failed")
-                    self.proxy_handler.mark_proxy_as_failed(self.current_proxy)
-                
-                # Retry with a new proxy
-                retries += 1
-                if retries < max_retries:
-                    logger.info(f"Retrying with new proxy (attempt {retries+1}/{max_retries})")
-                    self.setup_driver()  # Get new driver with fresh proxy
-                    
-                    # Need to authenticate again with new driver
-                    if not self.authenticate():
-                        logger.error("Authentication failed with new proxy")
-                        continue
-                        
-                    # Random delay between retries
-                    delay = random.uniform(2, 5)
-                    logger.info(f"Waiting {delay:.1f} seconds before retry")
-                    time.sleep(delay)
-                else:
-                    logger.error(f"Max retries reached for {url}")
+                failure = _classify_failure(e)
+            
+            if failure == FATAL:
+                logger.error(f"Not retrying {url}: the error won't go away on retry")
+                break
+            if attempt + 1 >= max_retries:
+                logger.error(f"Max retries reached for {url}")
+                break
+            
+            if failure == RATE_LIMITED:
+                delay = min(60, base_delay * 2 ** attempt) + random.random()
+                if attempt:
+                    logger.info("Still rate limited, retrying with new proxy")
+                    rotate = True
+            else:
+                logger.info(f"Retrying with new proxy (attempt {attempt+2}/{max_retries})")
+                rotate = True
+                # Random delay between retries
+                delay = random.uniform(2, 5)
+            
+            logger.info(f"Waiting {delay:.1f} seconds before retry")
+            time.sleep(delay)
         
         return None
 
@@ -187,14 +275,25 @@ class LinkedInScraper:
         """Scrape a company profile with retry logic"""
         
         def _do_scrape(url):
-            custom_scraper = CustomCompanyScraper(self.driver)
+            # authenticate() may have swapped the driver since setup_driver
+            if not self.company_scraper or self.company_scraper.driver is not self.driver:
+                self.company_scraper = CustomCompanyScraper(self.driver)
+            self.loaded_page = True
             # Don't include raw data and include employees
-            return custom_scraper.scrape_company(url)
+            return self.company_scraper.scrape_company(url)
+        
+        # Skip the page load for companies scraped recently
+        cached = self.company_cache.get(url)
+        if cached:
+            logger.info(f"Using cached company data for {url}")
+            return cached
         
         # Use retry logic
         company_data = self.scrape_with_retry(url, _do_scrape)
         
         if company_data:
+            self.company_cache.set(url, company_data)
+            
             # Save data to file
             company_name = company_data.get('JobDetails', {}).get('companyInfo', {}).get('name', 'unknown')
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -205,8 +304,10 @@ class LinkedInScraper:
             os.makedirs(output_dir, exist_ok=True)
             filepath = os.path.join(output_dir, f"{filename}.json")
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(company_data, f, ensure_ascii=False, indent=2)
+            # Compact unless PRETTY_JSON is set for reading the files by hand
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if PRETTY_JSON else 0)
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(company_data, default=str, option=option))
                 
             logger.info(f"Company data saved to {filepath}")
             return company_data
@@ -220,36 +321,62 @@ class LinkedInScraper:
         logger.warning("Profile scraping not implemented yet")
         return None
         
-    def run(self):
-        """Run the scraper for all defined URLs"""
-        # Authenticate first
+    def _start_workers(self, count):
+        """Authenticated scrapers for the worker threads, this one included"""
+        # Only this session logs in for real, so the account sees one login
+        # rather than one per session
         if not self.authenticate():
+            return []
+        self.auth.save_cookies(driver=self.driver)
+        
+        workers = [
+            LinkedInScraper(headless=self.headless, proxy_handler=self.proxy_handler)
+            for _ in range(count - 1)
+        ]
+        
+        # The extra sessions reuse the cookies just saved, concurrently; ones
+        # that fail are dropped
+        with ThreadPoolExecutor(max_workers=max(1, count - 1)) as executor:
+            authenticated = list(executor.map(LinkedInScraper.reauth_cookies, workers))
+        
+        ready = [self]
+        for worker, ok in zip(workers, authenticated):
+            if ok:
+                ready.append(worker)
+            elif worker.driver:
+                worker.driver.quit()
+        return ready
+        
+    def run(self, workers=SCRAPE_WORKERS):
+        """Run the scraper for all defined URLs, spread over several browser sessions"""
+        # Authenticate first
+        active = self._start_workers(workers)
+        if not active:
             logger.error("Authentication failed. Cannot continue.")
             return False
         
-        # Scrape companies
-        if COMPANY_URLS:
-            logger.info("=== SCRAPING COMPANIES ===")
-            for url in COMPANY_URLS:
-                self.scrape_company(url)
-                # Add delay between companies
-                delay = random.uniform(3, 8)
-                logger.info(f"Waiting {delay:.1f} seconds before next request")
-                time.sleep(delay)
+        # Each URL borrows a session from the queue, so at most len(active)
+        # pages load at once
+        sessions = queue.Queue()
+        for worker in active:
+            sessions.put(worker)
+        logger.info(f"Scraping with {len(active)} sessions")
         
-        # Scrape profiles
-        if PROFILE_URLS:
-            logger.info("=== SCRAPING PROFILES ===")
-            for url in PROFILE_URLS:
-                self.scrape_profile(url)
-                # Add delay between profiles
-                delay = random.uniform(3, 8)
-                logger.info(f"Waiting {delay:.1f} seconds before next request")
-                time.sleep(delay)
+        with ThreadPoolExecutor(max_workers=len(active)) as executor:
+            # Scrape companies
+            if COMPANY_URLS:
+                logger.info("=== SCRAPING COMPANIES ===")
+                list(executor.map(partial(_scrape_one, sessions, LinkedInScraper.scrape_company), COMPANY_URLS))
+            
+            # Scrape profiles
+            if PROFILE_URLS:
+                logger.info("=== SCRAPING PROFILES ===")
+                list(executor.map(partial(_scrape_one, sessions, LinkedInScraper.scrape_profile), PROFILE_URLS))
         
-        # Close the browser when done
-        if self.driver:
-            self.driver.quit()
+        # Close the browsers when done
+        for worker in active:
+            if worker.driver:
+                worker.driver.quit()
         
         logger.info("Scraping completed")
         return True
@@ -1,43 +1,40 @@
 import logging
 import time
-import re
 from linkedin_scraper.custom_company_scraper import CustomCompanyScraper
-from linkedin_scraper.company_url_extractor import CompanyUrlExtractor
+from linkedin_scraper.company_url_extractor import CompanyUrlExtractor, _build_company_slug
 from dataformatter.data_formatter import LinkedInFormatter
+from utils.company_cache import CompanyCache
 from utils.logging_config import LoggingConfig
 
 # Set up logging
 logger = LoggingConfig.setup_logging("company_scraper_integration")
 
 class CompanyScraperIntegration:
-    def __init__(self, driver, formatter=None):
+    def __init__(self, driver, formatter=None, company_cache=None):
         self.driver = driver
         self.company_scraper = CustomCompanyScraper(driver)
         self.url_extractor = CompanyUrlExtractor(driver)
         self.formatter = formatter if formatter else LinkedInFormatter()
-        self.company_cache = {}  # Cache to avoid re-scraping the same companies
+        # Cache to avoid re-scraping the same companies, kept on disk across runs
+        self.company_cache = company_cache or CompanyCache()
     
     def generate_company_url(self, company_name):
         """Generate a potential LinkedIn company URL from a company name"""
         if not company_name:
             return None
             
-        # Clean company name - remove Ltd, LLC, Inc, etc.
-        clean_name = re.sub(r'\s+(?:Ltd|LLC|Inc|Corp|Limited|Corporation|Company)\.?$', '', company_name, flags=re.IGNORECASE)
-        
-        # Replace spaces with hyphens and convert to lowercase
-        url_name = clean_name.lower().strip()
-        url_name = re.sub(r'\s+', '-', url_name)  # Replace spaces with hyphens
-        url_name = re.sub(r'[^\w\-]', '', url_name)  # Remove special chars except hyphens
-        
-        # Build URL
-        company_url = f"https://www.linkedin.com/company/{url_name}/"
+        # Build URL from the same cached slug the URL extractor uses
+        company_url = f"https://www.linkedin.com/company/{_build_company_slug(company_name)}/"
         logger.info(f"Generated company URL: {company_url} from name: {company_name}")
         
         return company_url
         
-    def scrape_company_for_job(self, job_data):
-        """Scrape company details for a job and attach to job data"""
+    def scrape_company_for_job(self, job_data, preserve_job_tab=False):
+        """Scrape company details for a job and attach to job data
+        
+        The company page replaces the job page in the current tab; pass
+        preserve_job_tab=True to scrape it in a new tab instead.
+        """
         company_name = job_data.get("company", "")
         
         # Get company URL directly from name
@@ -55,24 +52,23 @@ class CompanyScraperIntegration:
             return job_data
         
         # Check if we already scraped this company
-        if company_url in self.company_cache:
+        cached = self.company_cache.get(company_url, kind="job_summary")
+        if cached:
             logger.info(f"Using cached company data for {company_name}")
-            job_data["company_data"] = self.company_cache[company_url]
+            job_data["company_data"] = cached
             return job_data
             
         logger.info(f"Scraping company details for job: {job_data.get('job_title')} at {company_name}")
         
+        original_window = None
         try:
-            # Current tab has the job details, so open company page in a new tab
-            original_window = self.driver.current_window_handle
-            
-            # Open a new window
-            self.driver.execute_script("window.open('');")
-            
-            # Switch to the new window
-            self.driver.switch_to.window(self.driver.window_handles[1])
+            if preserve_job_tab:
+                # Current tab has the job details, so open company page in a new tab
+                original_window = self.driver.current_window_handle
+                self.driver.execute_script("window.open('');")
+                self.driver.switch_to.window(self.driver.window_handles[-1])
             
-            # Scrape the company
+            # Scrape the company; it navigates with driver.get in the current tab
             company_data_dict = self.company_scraper.scrape_company(company_url)
             
             # Format the data for job listings - extract simplified company data
@@ -95,14 +91,15 @@ class CompanyScraperIntegration:
                 }
                 
                 # Cache the company data
-                self.company_cache[company_url] = simplified_company
+                self.company_cache.set(company_url, simplified_company, kind="job_summary")
                 
                 # Add to job data
                 job_data["company_data"] = simplified_company
             
             # Close the tab and go back to job details tab
-            self.driver.close()
-            self.driver.switch_to.window(original_window)
+            if original_window:
+                self.driver.close()
+                self.driver.switch_to.window(original_window)
             
             logger.info(f"Successfully added company details for job at {company_name}")
             
@@ -112,7 +109,7 @@ class CompanyScraperIntegration:
             logger.error(traceback.format_exc())
             try:
                 # Make sure to return to original tab if there was an error
-                if len(self.driver.window_handles) > 1:
+                if original_window and len(self.driver.window_handles) > 1:
                     self.driver.close()
                     self.driver.switch_to.window(original_window)
             except:
@@ -1,6 +1,6 @@
-import time
 import logging
 import re
+from functools import lru_cache
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -10,6 +10,61 @@ from utils.logging_config import LoggingConfig
 # Set up logging
 logger = LoggingConfig.setup_logging("company_url_extractor")
 
+# Compiled once; company slugs are built for every scraped job
+_SUFFIX_RE = re.compile(r'\s+(?:Ltd|LLC|Inc|Corp|Limited|Corporation|Company|Technologies|Services|Solutions)\.?$', re.IGNORECASE)
+_SPACES_RE = re.compile(r'\s+')
+_NONWORD_RE = re.compile(r'[^\w\-]')
+
+@lru_cache(maxsize=4096)
+def _build_company_slug(company_name):
+    """LinkedIn company slug guessed from a company name; employers recur across jobs"""
+    # Clean company name - remove Ltd, LLC, Inc, etc.
+    clean_name = _SUFFIX_RE.sub('', company_name)
+    
+    # Replace spaces with hyphens and convert to lowercase
+    url_name = clean_name.lower().strip()
+    url_name = _SPACES_RE.sub('-', url_name)  # Replace spaces with hyphens
+    return _NONWORD_RE.sub('', url_name)  # Remove special chars except hyphens
+
+# Where company URLs show up in the JSON embedded in a job page, tried in order
+COMPANY_URL_PATTERNS = [
+    r'"companyPageUrl":"(https:\\\/\\\/www\.linkedin\.com\\\/company\\\/[^"]+)"',
+    r'"companyUrn":"([^"]+)"'
+]
+
+# Returns the first company link's href, else group 1 of the first pattern
+# that matches the page's HTML, or null. The link is found through the DOM so
+# the page is only serialized when there is none.
+FIND_COMPANY_URL_JS = """
+const link = document.querySelector('a[href^="https://www.linkedin.com/company/"]');
+if (link) return link.getAttribute('href');
+const html = document.documentElement.outerHTML;
+for (const pattern of arguments[0]) {
+    const match = html.match(new RegExp(pattern));
+    if (match) return match[1];
+}
+return null;
+"""
+
+# Elements holding the company name on the job page variants LinkedIn serves
+COMPANY_NAME_SELECTORS = [
+    ".jobs-unified-top-card__company-name",
+    ".job-details-jobs-unified-top-card__company-name",
+    ".jobs-company__name",
+    "[data-tracking-control-name='public_jobs_topcard-org-name']"
+]
+
+# Returns the trimmed text of the first selector with any, or null; one
+# WebDriver call instead of a find_element per selector
+FIND_TEXT_JS = """
+for (const selector of arguments[0]) {
+    const element = document.querySelector(selector);
+    const text = element && element.innerText.trim();
+    if (text) return text;
+}
+return null;
+"""
+
 class CompanyUrlExtractor:
     def __init__(self, driver):
         self.driver = driver
@@ -19,64 +74,52 @@ class CompanyUrlExtractor:
         if not company_name:
             return None
             
-        # Clean company name - remove Ltd, LLC, Inc, etc.
-        clean_name = re.sub(r'\s+(?:Ltd|LLC|Inc|Corp|Limited|Corporation|Company|Technologies|Services|Solutions)\.?$', '', company_name, flags=re.IGNORECASE)
-        
-        # Replace spaces with hyphens and convert to lowercase
-        url_name = clean_name.lower().strip()
-        url_name = re.sub(r'\s+', '-', url_name)  # Replace spaces with hyphens
-        url_name = re.sub(r'[^\w\-]', '', url_name)  # Remove special chars except hyphens
-        
         # Build URL
-        company_url = f"https://www.linkedin.com/company/{url_name}/"
+        company_url = f"https://www.linkedin.com/company/{_build_company_slug(company_name)}/"
         logger.info(f"Generated company URL: {company_url} from name: {company_name}")
         
         return company_url
     
+    def _open_job_page(self, job_url):
+        """Navigate to a job page unless already there, returning once the company name renders"""
+        if self.driver.current_url == job_url:
+            return
+        self.driver.get(job_url)
+        try:
+            WebDriverWait(self.driver, 8).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(COMPANY_NAME_SELECTORS)))
+            )
+        except TimeoutException:
+            logger.debug(f"Company name did not render on {job_url}")
+    
     def extract_company_url_from_job(self, job_url):
         """Extract company URL from a job listing page"""
         logger.info(f"Extracting company URL from job page: {job_url}")
         
         try:
             # Navigate to the job page
-            current_url = self.driver.current_url
-            if current_url != job_url:
-                self.driver.get(job_url)
-                time.sleep(3)
+            self._open_job_page(job_url)
             
             # First get the company name, which we'll need if direct extraction fails
-            company_name = None
-            for selector in [".jobs-unified-top-card__company-name", ".job-details-jobs-unified-top-card__company-name"]:
-                try:
-                    company_name_elem = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    company_name = company_name_elem.text.strip()
-                    if company_name:
-                        break
-                except NoSuchElementException:
-                    pass
+            company_name = self.driver.execute_script(FIND_TEXT_JS, COMPANY_NAME_SELECTORS[:2])
             
             # Try multiple approaches to find the company link
             company_url = None
             
-            # Method 1: Direct company name link
+            # Methods 1 and 2: Company name link, in either top card variant; one
+            # wait covers both so the second variant doesn't sit out the timeout
             try:
                 company_link = WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".jobs-unified-top-card__company-name a"))
+                    EC.presence_of_element_located((
+                        By.CSS_SELECTOR,
+                        ".jobs-unified-top-card__company-name a, .job-details-jobs-unified-top-card__company-name a"
+                    ))
                 )
                 company_url = company_link.get_attribute("href")
                 logger.info(f"Found company URL (method 1): {company_url}")
             except (TimeoutException, NoSuchElementException):
                 pass
             
-            # Method 2: Alternative selector
-            if not company_url:
-                try:
-                    company_link = self.driver.find_element(By.CSS_SELECTOR, ".job-details-jobs-unified-top-card__company-name a")
-                    company_url = company_link.get_attribute("href")
-                    logger.info(f"Found company URL (method 2): {company_url}")
-                except NoSuchElementException:
-                    pass
-            
             # Method 3: Try clicking on company name to see if it's a link
             if not company_url:
                 try:
@@ -94,17 +137,22 @@ class CompanyUrlExtractor:
                             try:
                                 current_url = self.driver.current_url
                                 element.click()
-                                time.sleep(2)
                                 
                                 # If URL changed, we likely got to the company page
-                                if self.driver.current_url != current_url:
-                                    company_url = self.driver.current_url
-                                    logger.info(f"Found company URL by clicking (method 3): {company_url}")
-                                    
-                                    # Go back to job page
-                                    self.driver.back()
-                                    time.sleep(2)
-                                    break
+                                try:
+                                    WebDriverWait(self.driver, 2).until(EC.url_changes(current_url))
+                                except TimeoutException:
+                                    continue
+                                company_url = self.driver.current_url
+                                logger.info(f"Found company URL by clicking (method 3): {company_url}")
+                                
+                                # Go back to job page
+                                self.driver.back()
+                                try:
+                                    WebDriverWait(self.driver, 5).until(EC.url_to_be(current_url))
+                                except TimeoutException:
+                                    logger.debug("Job page did not come back after clicking")
+                                break
                             except:
                                 continue
                 except Exception as e:
@@ -113,23 +161,13 @@ class CompanyUrlExtractor:
             # Method 4: Extract from HTML source
             if not company_url:
                 try:
-                    html_source = self.driver.page_source
-                    # Look for company URLs in the page source
-                    company_patterns = [
-                        r'href="(https://www\.linkedin\.com/company/[^"]+)"',
-                        r'"companyPageUrl":"(https:\\\/\\\/www\.linkedin\.com\\\/company\\\/[^"]+)"',
-                        r'"companyUrn":"([^"]+)"'
-                    ]
-                    
-                    for pattern in company_patterns:
-                        matches = re.findall(pattern, html_source)
-                        if matches:
-                            # Take first match
-                            raw_url = matches[0]
-                            # Clean up any escaped characters
-                            company_url = raw_url.replace('\\/', '/')
-                            logger.info(f"Found company URL from HTML source (method 4): {company_url}")
-                            break
+                    # Look for company URLs in the page; the search runs in the
+                    # browser so only the match comes back, not the whole page
+                    raw_url = self.driver.execute_script(FIND_COMPANY_URL_JS, COMPANY_URL_PATTERNS)
+                    if raw_url:
+                        # Clean up any escaped characters
+                        company_url = raw_url.replace('\\/', '/')
+                        logger.info(f"Found company URL from HTML source (method 4): {company_url}")
                 except Exception as e:
                     logger.debug(f"Error in method 4: {str(e)}")
             
@@ -169,31 +207,12 @@ class CompanyUrlExtractor:
         
         try:
             # Navigate to the job page if needed
-            current_url = self.driver.current_url
-            if current_url != job_url:
-                self.driver.get(job_url)
-                time.sleep(2)
-            
-            # Extract company name using multiple selectors
-            company_name = None
-            
-            # Try various selectors to find the company name
-            selectors = [
-                ".jobs-unified-top-card__company-name",
-                ".job-details-jobs-unified-top-card__company-name",
-                ".jobs-company__name",
-                "[data-tracking-control-name='public_jobs_topcard-org-name']"
-            ]
+            self._open_job_page(job_url)
             
-            for selector in selectors:
-                try:
-                    company_name_elem = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    company_name = company_name_elem.text.strip()
-                    if company_name:
-                        logger.info(f"Found company name: {company_name}")
-                        break
-                except NoSuchElementException:
-                    continue
+            # Try various selectors to find the company name, all in one call
+            company_name = self.driver.execute_script(FIND_TEXT_JS, COMPANY_NAME_SELECTORS)
+            if company_name:
+                logger.info(f"Found company name: {company_name}")
             
             return company_name
             
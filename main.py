@@ -85,11 +85,7 @@ class LinkedInScraper:
             company_data = self.formatter.format_company_data_from_dict(company_data_dict)
             self.companies.append(company_data)
             
-            # Save to file
             company_name = company_data['JobDetails']['companyInfo']['name']
-            filename = f"company_{company_name.replace(' ', '_')}"
-            self.formatter.save_to_json(company_data, filename)
-            
             logger.info(f"Successfully scraped company: {company_name}")
             
             # Add random delay between requests
@@ -125,10 +121,6 @@ class LinkedInScraper:
             profile_data = self.formatter.format_profile_data(person)
             self.profiles.append(profile_data)
             
-            # Save to file
-            filename = f"profile_{profile_data['name'].replace(' ', '_')}"
-            self.formatter.save_to_json(profile_data, filename)
-            
             logger.info(f"Successfully scraped profile: {profile_data['name']}")
             
             # Add random delay between requests
@@ -147,23 +139,31 @@ class LinkedInScraper:
             logger.error("Authentication failed. Cannot continue.")
             return False
         
-        # Scrape companies
-        if COMPANY_URLS:
-            logger.info("=== SCRAPING COMPANIES ===")
-            for url in COMPANY_URLS:
-                self.scrape_company(url)
-                time.sleep(random.uniform(2, 5))  # Add delay between companies
-        
-        # Scrape profiles
-        if PROFILE_URLS:
-            logger.info("=== SCRAPING PROFILES ===")
-            for url in PROFILE_URLS:
-                self.scrape_profile(url)
-                time.sleep(random.uniform(2, 5))  # Add delay between profiles
-        
-        # Close the browser when done
-        if self.driver:
-            self.driver.quit()
+        try:
+            # Scrape companies
+            if COMPANY_URLS:
+                logger.info("=== SCRAPING COMPANIES ===")
+                for url in COMPANY_URLS:
+                    self.scrape_company(url)
+                    time.sleep(random.uniform(2, 5))  # Add delay between companies
+            
+            # Scrape profiles
+            if PROFILE_URLS:
+                logger.info("=== SCRAPING PROFILES ===")
+                for url in PROFILE_URLS:
+                    self.scrape_profile(url)
+                    time.sleep(random.uniform(2, 5))  # Add delay between profiles
+        finally:
+            # Save each kind of record to one file rather than a file per
+            # record; also on a crash or Ctrl+C, so finished scrapes aren't lost
+            if self.companies:
+                self.formatter.save_batch(self.companies, "companies")
+            if self.profiles:
+                self.formatter.save_batch(self.profiles, "profiles")
+            
+            # Close the browser when done
+            if self.driver:
+                self.driver.quit()
         
         return True
 
@@ -15,7 +15,7 @@ class BrowserSetup:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
     
-    def create_driver(self, use_proxy=False, proxy=None, headless=False):
+    def create_driver(self, use_proxy=False, proxy=None, headless=False, block_images=False):
         """Create a Chrome driver with various options"""
         options = Options()
         
@@ -52,6 +52,10 @@ class BrowserSetup:
         if headless:
             options.add_argument('--headless=new')
         
+        # Skip image download and decoding when pages are only scripted
+        if block_images:
+            options.add_argument('--blink-settings=imagesEnabled=false')
+        
         # Random user agent
         user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -63,7 +67,8 @@ class BrowserSetup:
         
         # Create the driver
         try:
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+            # keep_alive reuses the HTTP connection to chromedriver for every command
+            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options, keep_alive=True)
             
             # Set shorter timeouts to avoid long hangs
             driver.set_page_load_timeout(30)
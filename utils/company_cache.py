@@ -0,0 +1,61 @@
+import os
+import time
+import sqlite3
+import threading
+import orjson
+
+from utils.logging_config import LoggingConfig
+
+logger = LoggingConfig.setup_logging("company_cache")
+
+DEFAULT_TTL = 7 * 24 * 3600  # company pages change rarely; re-scrape weekly
+
+def company_slug(company_url):
+    """Slug identifying a company, e.g. 'microsoft' for .../company/microsoft/
+
+    URLs without /company/ (schools, showcase pages) are keyed by their
+    whole path, e.g. 'school/stanford-university', so they never collide.
+    """
+    path = company_url.split('?')[0].split('#')[0].rstrip('/').lower()
+    if '/company/' in path:
+        return path.split('/company/')[-1].split('/')[0]
+    return path.split('://')[-1].split('/', 1)[-1]
+
+class CompanyCache:
+    """Scraped company data kept on disk, so restarts and other scripts skip companies scraped recently"""
+    
+    def __init__(self, path="cache/companies.sqlite", ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets several scraper processes read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS companies ("
+            "kind TEXT, slug TEXT, data BLOB, cached_at REAL, PRIMARY KEY (kind, slug))"
+        )
+    
+    def get(self, company_url, kind="company"):
+        """Cached data for a company URL, or None if missing or older than the TTL"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT data FROM companies WHERE kind = ? AND slug = ? AND cached_at > ?",
+                    (kind, company_slug(company_url), time.time() - self.ttl)
+                ).fetchone()
+            return orjson.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Error reading company cache: {str(e)}")
+            return None
+    
+    def set(self, company_url, data, kind="company"):
+        """Store data for a company URL, replacing any older entry"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO companies (kind, slug, data, cached_at) VALUES (?, ?, ?, ?)",
+                    (kind, company_slug(company_url), orjson.dumps(data, default=str), time.time())
+                )
+        except Exception as e:
+            logger.warning(f"Error writing company cache: {str(e)}")
@@ -105,26 +105,29 @@ class LinkedInCookieAuth:
             with open(self.cookie_file, 'rb') as f:
                 cookies = pickle.load(f)
             
-            # Navigate to LinkedIn domain first
-            driver.get('https://www.linkedin.com')
-            time.sleep(2)
-            
-            for cookie in cookies:
-                try:
-                    # Some cookies can't be added directly
-                    if 'expiry' in cookie:
-                        # Selenium expects expiry as an int, not float
-                        cookie['expiry'] = int(cookie['expiry'])
-                    driver.add_cookie(cookie)
-                except Exception as e:
-                    pass
-            
+            self.apply_cookies(driver, cookies)
             self.logger.info(f"Successfully loaded {len(cookies)} cookies")
             return True
         except Exception as e:
             self.logger.error(f"Error loading cookies: {str(e)}")
             return False
     
+    def apply_cookies(self, driver, cookies):
+        """Add already-loaded cookies to the driver"""
+        # Cookies can only be added for the page's domain; robots.txt is the
+        # cheapest LinkedIn page to be on
+        driver.get('https://www.linkedin.com/robots.txt')
+        
+        for cookie in cookies:
+            try:
+                # Some cookies can't be added directly
+                if 'expiry' in cookie:
+                    # Selenium expects expiry as an int, not float
+                    cookie['expiry'] = int(cookie['expiry'])
+                driver.add_cookie(cookie)
+            except Exception as e:
+                pass
+    
     def verify_login(self, driver):
         """Verify if login using cookies was successful"""
         try:
@@ -1,8 +1,13 @@
+import os
 import random
 import logging
+import sqlite3
 import requests
 import time
+import threading
 import urllib3
+from collections import deque
+from functools import lru_cache
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -11,14 +16,31 @@ from webdriver_manager.chrome import ChromeDriverManager
 # Suppress insecure request warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Images, fonts, media and trackers the scrapers never read; blocked in every
+# driver, including the cookie minter's
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.woff*", "*.ttf", "*.mp4",
+    "*doubleclick.net*", "*google-analytics*", "*googletagmanager*"
+]
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    """Resolve (and download if needed) chromedriver once per process"""
+    return ChromeDriverManager().install()
+
 class ProxyHandler:
-    def __init__(self, proxy_file='proxies.txt', test_url='https://www.google.com'):
+    FAILED_PROXY_TTL = 300  # seconds a failed proxy sits out before it is retried
+    MAX_PROXY_FAILURES = 3  # failures in a row after which a proxy sits out until it tests fine again
+    
+    def __init__(self, proxy_file='proxies.txt', test_url='https://www.google.com', state_file='cache/proxy_state.sqlite'):
         self.proxy_file = proxy_file
         self.proxies = self.load_proxies()
-        self.working_proxies = []
-        self.failed_proxies = set()
-        self.current_index = 0
+        self.working_proxies = deque()
+        # Proxy failures live in SQLite so every scraper process skips the same dead proxies
+        self._state = self._open_state(state_file)
+        self._state_lock = threading.Lock()
         self.test_url = test_url
+        self._rotation_lock = threading.Lock()  # drivers may be created from several threads
         self.logger = self._setup_logger()
     
     def _setup_logger(self):
@@ -51,9 +73,47 @@ class ProxyHandler:
                 pass
         return proxies
     
-    def test_proxy(self, proxy):
-        """Test if a proxy works with a basic connection test"""
-        if not proxy or proxy in self.failed_proxies:
+    @staticmethod
+    def _open_state(state_file):
+        """Open the proxy failure table shared by every ProxyHandler using state_file"""
+        os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+        conn = sqlite3.connect(state_file, timeout=5, check_same_thread=False, isolation_level=None)
+        # WAL lets other processes read proxy health while one records a failure
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS proxies ("
+            "url TEXT PRIMARY KEY, failures INTEGER NOT NULL, last_fail REAL NOT NULL)"
+        )
+        return conn
+    
+    def _query(self, sql, params=()):
+        """Run one statement on the shared state and return its rows"""
+        with self._state_lock:
+            return self._state.execute(sql, params).fetchall()
+    
+    def failed_proxies(self):
+        """Proxies failed in any process: within the last FAILED_PROXY_TTL seconds, or MAX_PROXY_FAILURES times in a row"""
+        rows = self._query(
+            "SELECT url FROM proxies WHERE last_fail > ? OR failures >= ?",
+            (time.time() - self.FAILED_PROXY_TTL, self.MAX_PROXY_FAILURES)
+        )
+        return {url for url, in rows}
+    
+    def is_failed(self, proxy):
+        """Whether a proxy failed recently or keeps failing; expired failures are ignored"""
+        rows = self._query(
+            "SELECT 1 FROM proxies WHERE url = ? AND (last_fail > ? OR failures >= ?)",
+            (proxy, time.time() - self.FAILED_PROXY_TTL, self.MAX_PROXY_FAILURES)
+        )
+        return bool(rows)
+    
+    def test_proxy(self, proxy, skip_failed=True):
+        """Test if a proxy works with a basic connection test
+        
+        Failed proxies are skipped unless skip_failed is False; one that
+        passes has its failures cleared for every process.
+        """
+        if not proxy or (skip_failed and self.is_failed(proxy)):
             return False
             
         try:
@@ -79,28 +139,31 @@ class ProxyHandler:
             # Check if proxy returns a successful response
             if response.status_code == 200:
                 self.logger.info(f"Proxy {proxy} is working")
+                self._query("DELETE FROM proxies WHERE url = ?", (proxy,))
                 return True
             else:
-                self.failed_proxies.add(proxy)
+                self.mark_proxy_as_failed(proxy)
                 self.logger.info(f"Proxy {proxy} returned status code {response.status_code}")
                 return False
                 
         except requests.exceptions.RequestException as e:
-            self.failed_proxies.add(proxy)
+            self.mark_proxy_as_failed(proxy)
             self.logger.debug(f"Proxy {proxy} failed: {str(e)}")
             return False
     
     def find_working_proxies(self, count=5, max_to_test=20):
         """Find working proxies by testing a random selection"""
-        self.working_proxies = []
+        self.working_proxies = deque()
         
         # First try proxies we haven't marked as failed
-        available_proxies = [p for p in self.proxies if p not in self.failed_proxies]
+        failed = self.failed_proxies()
+        available_proxies = [p for p in self.proxies if p not in failed]
         
-        # If we're running low on options, reset and try all proxies again
-        if len(available_proxies) < count:
-            self.logger.info("Running out of untested proxies, resetting failed list")
-            self.failed_proxies = set()
+        # If we're running low on options, test failed proxies again too; their
+        # shared failure records stay, so other processes keep skipping them
+        retest_failed = len(available_proxies) < count
+        if retest_failed:
+            self.logger.info("Running out of untested proxies, retesting failed ones")
             available_proxies = self.proxies
         
         # Select random proxies to test
@@ -109,7 +172,7 @@ class ProxyHandler:
         self.logger.info(f"Testing {len(test_proxies)} proxies")
         for proxy in test_proxies:
             print(f"Testing proxy: {proxy}")
-            if self.test_proxy(proxy):
+            if self.test_proxy(proxy, skip_failed=not retest_failed):
                 self.working_proxies.append(proxy)
                 if len(self.working_proxies) >= count:
                     break
@@ -117,21 +180,41 @@ class ProxyHandler:
         self.logger.info(f"Found {len(self.working_proxies)} working proxies")
         return len(self.working_proxies) > 0
     
-    def get_random_proxy(self):
-        """Get a random working proxy"""
+    def next_proxy(self):
+        """Get the next working proxy in round-robin order, skipping recently failed ones"""
+        with self._rotation_lock:
+            return self._next_proxy()
+    
+    def _next_proxy(self):
         if not self.working_proxies and not self.find_working_proxies():
             return None
         
-        if not self.working_proxies:
-            return None
-            
-        return random.choice(self.working_proxies)
+        # Failed proxies stay in the rotation and are skipped until their TTL
+        # expires (or, after repeated failures, until they test fine again)
+        failed = self.failed_proxies()
+        for _ in range(len(self.working_proxies)):
+            proxy = self.working_proxies.popleft()
+            self.working_proxies.append(proxy)
+            if proxy not in failed:
+                return proxy
+        
+        # Every known proxy is cooling down, so look for fresh ones
+        if self.find_working_proxies():
+            return self.working_proxies[0]
+        return None
+    
+    def get_random_proxy(self):
+        """Get a working proxy (kept for callers of the old name)"""
+        return self.next_proxy()
     
     def mark_proxy_as_failed(self, proxy):
-        """Mark a proxy as failed"""
-        if proxy in self.working_proxies:
-            self.working_proxies.remove(proxy)
-        self.failed_proxies.add(proxy)
+        """Mark a proxy as failed for every process, counting failures in a row"""
+        if proxy:
+            self._query(
+                "INSERT INTO proxies (url, failures, last_fail) VALUES (?, 1, ?) "
+                "ON CONFLICT(url) DO UPDATE SET failures = failures + 1, last_fail = excluded.last_fail",
+                (proxy, time.time())
+            )
         
     def create_driver(self, use_proxy=True, headless=False):
         """Create a WebDriver with improved SSL handling for proxies"""
@@ -153,6 +236,13 @@ class ProxyHandler:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-notifications")
         
+        # Don't load images; logos are read from their src attribute
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        
+        # Return from driver.get once the DOM is ready rather than after every
+        # subresource; scrapers wait for the elements they need explicitly
+        options.page_load_strategy = "eager"
+        
         # Add headless mode if requested
         if headless:
             options.add_argument("--headless=new")
@@ -163,17 +253,25 @@ class ProxyHandler:
         # Add proxy if requested and available
         proxy = None
         if use_proxy:
-            proxy = self.get_random_proxy()
+            proxy = self.next_proxy()
             if proxy:
                 options.add_argument(f'--proxy-server=http://{proxy}')
                 self.logger.info(f"Using proxy: {proxy}")
         
         try:
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+            # keep_alive reuses the HTTP connection to chromedriver for every command
+            driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options, keep_alive=True)
             
             # Anti-detection script
             driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
+            # Skip downloading assets the scrapers don't need
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+            except Exception as e:
+                self.logger.warning(f"Could not block page assets: {str(e)}")
+            
             return driver, proxy
             
         except Exception as e: